@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+"""Benchmarks for the neural SDK.
+
+``python -m benchmarks run`` executes the regression suite in
+benchmarks/suite.py and writes machine-readable JSON; ``python -m benchmarks
+compare`` flags slowdowns between two such files. The other modules are
+focused studies runnable with ``python -m benchmarks.<name>``.
+"""
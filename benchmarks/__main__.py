@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Run the benchmark suite or compare two result files.
+
+Usage:
+  python -m benchmarks run [--out results.json] [--batch B] [--width W] ...
+  python -m benchmarks compare old.json new.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+
+from .harness import compare, environment
+
+def run(args):
+  from . import suite
+
+  params = {
+    "batch": args.batch,
+    "width": args.width,
+    "image_size": args.image_size,
+    "samples": args.samples,
+    "layers": args.layers,
+    "repeat": args.repeat,
+  }
+  results = suite.run(**params)
+  document = {
+    "environment": environment(),
+    "params": params,
+    "unit": "seconds per call",
+    "results": results,
+  }
+  with open(args.out, "w") as f:
+    json.dump(document, f, indent=2, sort_keys=True)
+  for name, stats in sorted(results.items()):
+    print("%-36s %12.3f ms" % (name, stats["median"] * 1e3))
+  print("wrote %s" % args.out)
+  return 0
+
+def compare_files(args):
+  with open(args.old) as f:
+    old = json.load(f)
+  with open(args.new) as f:
+    new = json.load(f)
+  if old.get("params") != new.get("params"):
+    print("warning: runs used different parameters", file=sys.stderr)
+  rows, regressed = compare(
+    old, new, threshold=args.threshold, statistic=args.statistic)
+  print("%-36s %12s %12s %8s" % ("benchmark", "old ms", "new ms", "ratio"))
+  for row in rows:
+    print("%-36s %12.3f %12.3f %7.2fx%s" % (
+      row["name"], row["old"] * 1e3, row["new"] * 1e3, row["ratio"],
+      "  SLOWER" if row["regressed"] else ""))
+  return 1 if regressed else 0
+
+def main():
+  parser = argparse.ArgumentParser(prog="python -m benchmarks")
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  runner = commands.add_parser("run", help="run the suite")
+  runner.add_argument("--out", default="benchmarks.json")
+  runner.add_argument("--batch", type=int, default=64)
+  runner.add_argument("--width", type=int, default=256)
+  runner.add_argument("--image-size", type=int, default=32)
+  runner.add_argument("--samples", type=int, default=8192)
+  runner.add_argument("--layers", type=int, default=16)
+  runner.add_argument("--repeat", type=int, default=5)
+  runner.set_defaults(handler=run)
+
+  comparer = commands.add_parser("compare", help="compare two runs")
+  comparer.add_argument("old")
+  comparer.add_argument("new")
+  comparer.add_argument("--threshold", type=float, default=0.1)
+  comparer.add_argument(
+    "--statistic", choices=["min", "median", "mean"], default="median")
+  comparer.set_defaults(handler=compare_files)
+
+  args = parser.parse_args()
+  sys.exit(args.handler(args))
+
+if __name__ == "__main__":
+  main()
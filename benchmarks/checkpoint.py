@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Save and load a checkpoint of a model with over 100M parameters.
+
+Reports the wall time of a blocking save, the time training is blocked by a
+background save (the in-memory snapshot), a copying load and a memory-mapped
+load, together with the size of the checkpoint on disk.
+
+Usage: python -m benchmarks.checkpoint [--width W] [--directory D]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+
+def build(width):
+  """Return a float32 model with about width ** 2 parameters, trained with
+  Adam so that the checkpoint also carries two moment arrays."""
+  return Sequential(
+    [Dense(width, width, dtype=np.float32), ReLU(),
+      Dense(width, 10, dtype=np.float32)],
+    loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+    dtype=np.float32)
+
+def timed(f, *args, **kwargs):
+  """Return the result of f and its wall time in seconds."""
+  start = time.perf_counter()
+  result = f(*args, **kwargs)
+  return result, time.perf_counter() - start
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--width", type=int, default=10000)
+  parser.add_argument("--directory", default=None)
+  args = parser.parse_args()
+
+  directory = args.directory or tempfile.mkdtemp(prefix="neural-checkpoint-")
+  path = os.path.join(directory, "model")
+  model = build(args.width)
+  print("parameters: %d" % model.optimizer.arena.size)
+
+  _, blocking = timed(model.save, path)
+  size = sum(os.path.getsize(os.path.join(path, name))
+    for name in os.listdir(path))
+  pending, snapshot = timed(model.save, path, background=True)
+  _, remaining = timed(pending.wait)
+
+  restored = build(args.width)
+  _, copy = timed(restored.load, path)
+  _, mmap = timed(restored.load, path, mmap=True)
+
+  print("%-24s %10s" % ("operation", "seconds"))
+  print("%-24s %10.3f" % ("save (blocking)", blocking))
+  print("%-24s %10.3f" % ("save (background, block)", snapshot))
+  print("%-24s %10.3f" % ("save (background, write)", remaining))
+  print("%-24s %10.3f" % ("load (copy)", copy))
+  print("%-24s %10.3f" % ("load (mmap)", mmap))
+  print("checkpoint size: %.1f MB (%.2f GB/s blocking save)"
+    % (size / 2 ** 20, size / blocking / 2 ** 30))
+
+  if args.directory is None:
+    shutil.rmtree(directory)
+
+if __name__ == "__main__":
+  main()
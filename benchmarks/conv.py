@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""Throughput of Conv2D, MaxPool2D and AvgPool2D on MNIST and CIFAR shapes.
+
+Usage: python -m benchmarks.conv [--batch B] [--repeat R]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural.nn.images import Conv2D, MaxPool2D, AvgPool2D
+
+SHAPES = [("MNIST", (1, 28, 28)), ("CIFAR", (3, 32, 32))]
+
+def images_per_second(module, x, repeat):
+  """Return (forward, forward + backward) images per second."""
+  grad = np.ones_like(module.forward(x))
+  start = time.perf_counter()
+  for _ in range(repeat):
+    module.forward(x)
+  forward = time.perf_counter() - start
+  start = time.perf_counter()
+  for _ in range(repeat):
+    module.forward(x)
+    module.backward(grad)
+  both = time.perf_counter() - start
+  return x.shape[0] * repeat / forward, x.shape[0] * repeat / both
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batch", type=int, default=128)
+  parser.add_argument("--repeat", type=int, default=10)
+  args = parser.parse_args()
+
+  print("%-6s %-22s %14s %16s" % ("data", "module", "fwd img/s", "fwd+bwd img/s"))
+  for data, (channels, height, width) in SHAPES:
+    x = np.random.randn(args.batch, channels, height, width)
+    modules = [
+      ("Conv2D 3x3 -> 32", Conv2D(channels, 32, 3, padding=1)),
+      ("Conv2D 5x5 s2 -> 64", Conv2D(channels, 64, 5, stride=2)),
+      ("MaxPool2D 2x2", MaxPool2D(2)),
+      ("AvgPool2D 2x2", AvgPool2D(2)),
+    ]
+    for name, module in modules:
+      module.reuse_buffers()
+      forward, both = images_per_second(module, x, args.repeat)
+      print("%-6s %-22s %14.0f %16.0f" % (data, name, forward, both))
+
+if __name__ == "__main__":
+  main()
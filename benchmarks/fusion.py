@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Compare eager and compiled execution of deep narrow MLPs.
+
+With narrow layers each kernel is cheap, so the time per step is dominated
+by per-module overhead and passes over intermediate arrays, which is what
+Sequential.compile removes. Forward plus backward steps and predict calls
+are timed for several depths.
+
+Usage: python -m benchmarks.fusion [--width W] [--batch B] [--steps S]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, Tanh, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+
+def build_model(depth, width):
+  """Build an MLP of depth hidden Dense layers alternating ReLU and Tanh."""
+  modules = []
+  for i in range(depth):
+    modules += [Dense(width, width), ReLU() if i % 2 else Tanh()]
+  return Sequential(
+    modules + [Dense(width, 10)], loss=SoftmaxCrossEntropy, optimizer=SGD,
+    lr_scheduler=ConstantLR, reuse_buffers=True)
+
+def seconds_per_call(fn, steps):
+  """Return the mean wall time of fn over steps calls after a warmup."""
+  fn()
+  start = time.perf_counter()
+  for _ in range(steps):
+    fn()
+  return (time.perf_counter() - start) / steps
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--width", type=int, default=32)
+  parser.add_argument("--batch", type=int, default=32)
+  parser.add_argument("--steps", type=int, default=500)
+  args = parser.parse_args()
+
+  X = np.random.randn(args.batch, args.width)
+  y = np.random.randint(0, 10, size=args.batch)
+
+  print("%-6s %-10s %14s %14s" % ("depth", "mode", "step (us)", "predict (us)"))
+  for depth in [8, 32, 128]:
+    for mode in ["eager", "compiled"]:
+      model = build_model(depth, args.width)
+      if mode == "compiled":
+        model.compile(batch_sizes=[args.batch])
+
+      def step():
+        model.forward(X)
+        model.backward(y)
+
+      train = seconds_per_call(step, args.steps)
+      predict = seconds_per_call(lambda: model.predict(X), args.steps)
+      print("%-6d %-10s %14.1f %14.1f"
+        % (depth, mode, train * 1e6, predict * 1e6))
+
+if __name__ == "__main__":
+  main()
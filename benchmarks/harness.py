@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import platform
+import time
+
+import numpy as np
+
+def measure(fn, repeat=5, number=1, warmup=1):
+  """Time repeated calls of fn.
+
+  Parameters
+  ----------
+  fn : callable
+    Function taking no arguments.
+  repeat : int
+    Number of samples (defaults to 5).
+  number : int
+    Calls per sample (defaults to 1).
+  warmup : int
+    Untimed calls before sampling (defaults to 1).
+
+  Returns
+  -------
+  dict
+    Per-call seconds: min, median and mean over the samples, plus the
+    sample counts.
+  """
+  for _ in range(warmup):
+    fn()
+  samples = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in range(number):
+      fn()
+    samples.append((time.perf_counter() - start) / number)
+  return {
+    "min": float(np.min(samples)),
+    "median": float(np.median(samples)),
+    "mean": float(np.mean(samples)),
+    "repeat": repeat,
+    "number": number,
+  }
+
+def environment():
+  """Describe the machine and library versions a run was recorded on."""
+  return {
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "machine": platform.machine(),
+    "processor": platform.processor(),
+  }
+
+def compare(old, new, threshold=0.1, statistic="median"):
+  """Compare two result files.
+
+  Parameters
+  ----------
+  old : dict
+    Baseline results, as written by the run command.
+  new : dict
+    Candidate results.
+  threshold : float
+    Relative slowdown above which a benchmark is flagged (defaults to 0.1,
+    i.e. 10%).
+  statistic : str
+    Per-call statistic to compare (defaults to "median").
+
+  Returns
+  -------
+  (dict[], bool)
+    [0] One row per benchmark present in both files with the old and new
+        seconds, their ratio and whether it regressed.
+    [1] True if any benchmark regressed.
+  """
+  rows = []
+  for name in sorted(set(old["results"]) & set(new["results"])):
+    before = old["results"][name][statistic]
+    after = new["results"][name][statistic]
+    ratio = after / before if before else float("inf")
+    rows.append({
+      "name": name,
+      "old": before,
+      "new": after,
+      "ratio": ratio,
+      "regressed": ratio > 1 + threshold,
+    })
+  return rows, any(row["regressed"] for row in rows)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Compare Sequential.forward against the inference-only Sequential.predict.
+
+Usage: python -m benchmarks.inference [--samples N] [--repeat R]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, Tanh, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+
+def build_model():
+  """Build a 784-512-256-10 MLP."""
+  return Sequential(
+    [Dense(784, 512), ReLU(), Dense(512, 256), Tanh(), Dense(256, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR)
+
+def measure(fn, X, repeat):
+  """Return (best seconds, peak bytes, retained bytes) for fn(X)."""
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn(X)
+    best = min(best, time.perf_counter() - start)
+
+  tracemalloc.start()
+  baseline, _ = tracemalloc.get_traced_memory()
+  pred = fn(X)
+  current, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  retained = current - baseline - pred.nbytes
+  return best, peak - baseline, retained
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--samples", type=int, default=20000)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  X = np.random.randn(args.samples, 784)
+  model = build_model()
+  assert(np.allclose(model.forward(X), model.predict(X)))
+
+  print("%-10s %12s %14s %14s" % ("mode", "latency ms", "peak MiB", "retained MiB"))
+  for name, fn in [("forward", model.forward), ("predict", model.predict)]:
+    seconds, peak, retained = measure(fn, X, args.repeat)
+    print("%-10s %12.2f %14.1f %14.1f" % (
+      name, seconds * 1e3, peak / 2 ** 20, retained / 2 ** 20))
+
+if __name__ == "__main__":
+  main()
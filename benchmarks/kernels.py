@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Time the activation and loss kernels against the naive formulas.
+
+Each kernel is timed on a (batch, width) array against the naive formula it
+replaces. Correctness at extreme inputs is covered by tests/test_functional.py.
+
+Usage: python -m benchmarks.kernels [--batch B] [--width W] [--repeat R]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural.nn.functional import sigmoid, tanh, relu
+from neural.model import categorical_cross_entropy
+from neural.model import categorical_cross_entropy_from_logits
+
+def naive_sigmoid(x):
+  return 1 / (1 + np.exp(-x))
+
+def naive_tanh(x):
+  return (np.exp(x) - np.exp(-x)) / (np.exp(x) + np.exp(-x))
+
+def naive_relu(x):
+  return x * (x > 0)
+
+def naive_cross_entropy(logits, labels):
+  exp = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+  pred = exp / np.sum(exp, axis=1, keepdims=True)
+  return categorical_cross_entropy(pred, labels, reduce=False)
+
+def seconds(fn, repeat):
+  """Return the best wall time of fn over repeat calls."""
+  best = np.inf
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batch", type=int, default=256)
+  parser.add_argument("--width", type=int, default=1024)
+  parser.add_argument("--repeat", type=int, default=50)
+  args = parser.parse_args()
+
+  x = np.random.randn(args.batch, args.width)
+  out = np.empty_like(x)
+  workspace = np.empty_like(x)
+  labels = np.random.randint(0, args.width, size=args.batch)
+
+  kernels = [
+    ("sigmoid", lambda: sigmoid(x, out=out, workspace=workspace),
+     lambda: naive_sigmoid(x)),
+    ("tanh", lambda: tanh(x, out=out), lambda: naive_tanh(x)),
+    ("relu", lambda: relu(x, out=out), lambda: naive_relu(x)),
+    ("cross_entropy",
+     lambda: categorical_cross_entropy_from_logits(x, labels, reduce=False),
+     lambda: naive_cross_entropy(x, labels)),
+  ]
+  print("%-14s %12s %12s %9s" % ("kernel", "us", "naive us", "speedup"))
+  for name, kernel, naive in kernels:
+    fast = seconds(kernel, args.repeat)
+    slow = seconds(naive, args.repeat)
+    print("%-14s %12.1f %12.1f %8.1fx" % (
+      name, fast * 1e6, slow * 1e6, slow / fast))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Compare synchronous Dataset iteration with the prefetching DataLoader.
+
+Usage: python -m benchmarks.loader [--samples N] [--features F] [--batch B]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import Dataset, DataLoader
+
+def epoch(model, batches):
+  """Run one training epoch and return its wall time in seconds."""
+  start = time.perf_counter()
+  for X, y in batches:
+    model.forward(X)
+    model.backward(y)
+    model.optimizer.apply_gradients(model.params)
+  return time.perf_counter() - start
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--samples", type=int, default=50000)
+  parser.add_argument("--features", type=int, default=3072)
+  parser.add_argument("--batch", type=int, default=256)
+  args = parser.parse_args()
+
+  X = np.random.randn(args.samples, args.features)
+  y = np.eye(10)[np.random.randint(0, 10, size=args.samples)]
+  dataset = Dataset(X, y, batch=args.batch)
+  model = Sequential(
+    [Dense(args.features, 128), ReLU(), Dense(128, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR,
+    reuse_buffers=True)
+
+  loaders = [
+    ("Dataset", dataset),
+    ("DataLoader", DataLoader(dataset, prefetch=2)),
+    ("DataLoader block", DataLoader(dataset, block_shuffle=True)),
+  ]
+  print("%-18s %12s %12s" % ("iterator", "s / epoch", "wait s"))
+  for name, batches in loaders:
+    epoch(model, batches)
+    seconds = epoch(model, batches)
+    wait = getattr(batches, "wait_time", float("nan"))
+    print("%-18s %12.3f %12.3f" % (name, seconds, wait))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Iterate a memory-mapped dataset that is larger than RAM.
+
+Writes a synthetic dataset of the requested size in shards, then measures
+batches per second for a global shuffle and for locality-aware windows, and
+the time of one streamed Sequential.test pass.
+
+Usage: python -m benchmarks.memmap [--gigabytes G] [--directory D]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import MemmapDataset
+
+FEATURES = 1024
+CLASSES = 10
+SHARD_ROWS = 1 << 16
+
+def write_shards(directory, rows):
+  """Write rows synthetic data points as float32 .npy shards."""
+  os.makedirs(os.path.join(directory, "X"), exist_ok=True)
+  os.makedirs(os.path.join(directory, "y"), exist_ok=True)
+  for i, start in enumerate(range(0, rows, SHARD_ROWS)):
+    n = min(SHARD_ROWS, rows - start)
+    X = np.lib.format.open_memmap(
+      os.path.join(directory, "X", "%05d.npy" % i), mode="w+",
+      dtype=np.float32, shape=(n, FEATURES))
+    X[...] = np.random.randn(n, FEATURES)
+    X.flush()
+    labels = np.random.randint(0, CLASSES, size=n)
+    np.save(
+      os.path.join(directory, "y", "%05d.npy" % i),
+      np.eye(CLASSES, dtype=np.float32)[labels])
+
+def batches_per_second(dataset, limit):
+  """Return gathered batches per second over at most limit batches."""
+  start = time.perf_counter()
+  count = 0
+  for _ in dataset:
+    count += 1
+    if count == limit:
+      break
+  return count / (time.perf_counter() - start)
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--gigabytes", type=float, default=16)
+  parser.add_argument("--directory", default=None)
+  parser.add_argument("--batch", type=int, default=256)
+  parser.add_argument("--limit", type=int, default=2000)
+  args = parser.parse_args()
+
+  directory = args.directory or tempfile.mkdtemp(prefix="neural-memmap-")
+  rows = int(args.gigabytes * 2 ** 30) // (FEATURES * 4)
+  if not os.path.isdir(os.path.join(directory, "X")):
+    write_shards(directory, rows)
+  X, y = os.path.join(directory, "X"), os.path.join(directory, "y")
+
+  print("%-22s %14s" % ("order", "batches / s"))
+  size = MemmapDataset(X, y, batch=args.batch).size
+  for name, window in [("global shuffle", size), ("window 64", 64)]:
+    dataset = MemmapDataset(X, y, batch=args.batch, window=window)
+    print("%-22s %14.1f" % (name, batches_per_second(dataset, args.limit)))
+
+  model = Sequential(
+    [Dense(FEATURES, 256), ReLU(), Dense(256, CLASSES)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR,
+    dtype=np.float32)
+  start = time.perf_counter()
+  model.test(MemmapDataset(X, y, batch=args.batch))
+  print("test pass: %.1f s, peak RSS %.0f MiB" % (
+    time.perf_counter() - start,
+    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Measure the per-step cost of metrics and progress reporting in train.
+
+Trains a small model on small batches, where reporting overhead is a large
+share of the step, with a progress bar refreshed every batch, refreshed
+every report interval, with reporting turned off, and with extra top-k and
+confusion matrix metrics. Each is compared against a bare loop of forward,
+backward and optimizer steps without any metric, and against the same loop
+updating the loss and accuracy from the logits with a log-softmax.
+
+Usage: python -m benchmarks.metrics [--batch B] [--width W] [--classes C]
+                                   [--samples N]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+from neural.callbacks import ProgressBar
+from neural.metrics import Loss, Accuracy, TopKAccuracy, ConfusionMatrix
+from neural.utils.data import Dataset
+
+def bare(model, dataset, metrics=()):
+  """Step through dataset like train, updating metrics from the logits."""
+  model.set_training(True)
+  for X, y in dataset:
+    model.forward(X)
+    for metric in metrics:
+      metric.update(model.loss.logits, y)
+    model.backward(y)
+    model.optimizer.apply_gradients(model.params)
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batch", type=int, default=8)
+  parser.add_argument("--width", type=int, default=32)
+  parser.add_argument("--classes", type=int, default=10)
+  parser.add_argument("--samples", type=int, default=40000)
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+
+  X = np.random.randn(args.samples, args.width)
+  y = np.random.randint(0, args.classes, size=args.samples)
+  dataset = Dataset(X, y, batch=args.batch)
+  model = Sequential(
+    [Dense(args.width, args.width), ReLU(), Dense(args.width, args.classes)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR)
+
+  configurations = [
+    ("bare step loop (baseline)", None),
+    ("bare loop + log-softmax metrics", [Loss(), Accuracy()]),
+    ("progress every step", {"callbacks": [ProgressBar()],
+      "report_every": 1}),
+    ("progress every 50", {"callbacks": [ProgressBar()],
+      "report_every": 50}),
+    ("no reporting", {"callbacks": []}),
+    ("no reporting + top-5 + confusion", {"callbacks": [], "metrics": [
+      TopKAccuracy(5), ConfusionMatrix(args.classes)]}),
+  ]
+  bare(model, dataset)
+  print("%-34s %12s %10s" % ("configuration", "us / step", "overhead"))
+  baseline = None
+  for name, kwargs in configurations:
+    best = np.inf
+    for _ in range(args.repeat):
+      start = time.perf_counter()
+      with contextlib.redirect_stderr(io.StringIO()):
+        if isinstance(kwargs, dict):
+          model.train(dataset, **kwargs)
+        else:
+          bare(model, dataset, kwargs or ())
+      best = min(best, time.perf_counter() - start)
+    step = best / dataset.size
+    baseline = step if baseline is None else baseline
+    print("%-34s %12.1f %9.1f%%" % (
+      name, step * 1e6, (step / baseline - 1) * 100))
+
+if __name__ == "__main__":
+  main()
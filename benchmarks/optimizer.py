@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Compare the fused flat-arena optimizer step with the per-parameter loop.
+
+Usage: python -m benchmarks.optimizer [--layers L] [--width W] [--steps S]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural.nn import Dense
+from neural.optim import SGD, Adam
+
+def measure(optimizer, params, steps):
+  """Return seconds per apply_gradients call."""
+  optimizer.apply_gradients(params)
+  start = time.perf_counter()
+  for _ in range(steps):
+    optimizer.apply_gradients(params)
+  return (time.perf_counter() - start) / steps
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--layers", type=int, default=64)
+  parser.add_argument("--width", type=int, default=32)
+  parser.add_argument("--steps", type=int, default=200)
+  args = parser.parse_args()
+
+  print("%-6s %10s %14s %12s" % ("optim", "fused us", "per-param us", "speedup"))
+  for optim in [SGD, Adam]:
+    params = []
+    for _ in range(args.layers):
+      params += Dense(args.width, args.width).trainable_parameters
+    optimizer = optim()
+    optimizer.initialize_params(params)
+    for p in params:
+      p.grad[...] = np.random.randn(*p.grad.shape)
+
+    fused = measure(optimizer, params, args.steps)
+    # A copy of the list is not the registered one, forcing the slow path.
+    looped = measure(optimizer, list(params), args.steps)
+    print("%-6s %10.1f %14.1f %11.1fx" % (
+      optim.__name__, fused * 1e6, looped * 1e6, looped / fused))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Scaling of DataParallel training across worker counts.
+
+Reports epochs per second at each worker count and checks that two runs
+with the same seed end with bit-for-bit identical weights.
+
+Usage: python -m benchmarks.parallel [--workers 1 2 4 8] [--samples N]
+"""
+
+import os
+
+for var in ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]:
+  os.environ.setdefault(var, "1")
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from neural import Sequential, DataParallel
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import Dataset
+
+def run(workers, samples, seed):
+  """Train one epoch and return (seconds, weight digest)."""
+  np.random.seed(seed)
+  X = np.random.randn(samples, 784)
+  labels = np.random.randint(0, 10, size=samples)
+  model = Sequential(
+    [Dense(784, 512), ReLU(), Dense(512, 512), ReLU(), Dense(512, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+    seed=seed)
+  trainer = DataParallel(model, workers=workers)
+  start = time.perf_counter()
+  trainer.train(Dataset(X, labels, batch=256, rng=model.spawn_rng()))
+  seconds = time.perf_counter() - start
+  digest = hashlib.sha1(model.optimizer.arena.value.tobytes()).hexdigest()
+  return seconds, digest
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+  parser.add_argument("--samples", type=int, default=20000)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  print("%-8s %12s %10s %14s" % ("workers", "epochs / s", "speedup", "reproducible"))
+  base = None
+  for workers in args.workers:
+    seconds, digest = run(workers, args.samples, args.seed)
+    _, again = run(workers, args.samples, args.seed)
+    base = base or seconds
+    print("%-8d %12.3f %9.2fx %14s" % (
+      workers, 1 / seconds, base / seconds, digest == again))
+
+if __name__ == "__main__":
+  main()
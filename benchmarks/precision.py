@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Compare epoch time and accuracy across float64, float32 and mixed precision.
+
+Usage: python -m benchmarks.precision [--samples N] [--width W] [--epochs E]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import Dataset
+
+POLICIES = [
+  ("float64", np.float64, None),
+  ("float32", np.float32, None),
+  ("mixed", np.float32, np.float64),
+]
+
+def make_data(samples, features, classes, seed=0):
+  """Return a linearly separable-ish synthetic classification problem."""
+  rng = np.random.RandomState(seed)
+  centers = rng.randn(classes, features) * 0.1
+  labels = rng.randint(0, classes, size=samples)
+  X = centers[labels] + rng.randn(samples, features)
+  return X, np.eye(classes)[labels]
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--samples", type=int, default=20000)
+  parser.add_argument("--width", type=int, default=512)
+  parser.add_argument("--epochs", type=int, default=3)
+  args = parser.parse_args()
+
+  X, y = make_data(args.samples, 256, 10)
+  test = Dataset(X[-2000:], y[-2000:], batch=128)
+
+  print("%-8s %14s %10s %10s" % ("policy", "s / epoch", "test loss", "test acc"))
+  for name, dtype, master_dtype in POLICIES:
+    model = Sequential(
+      [Dense(256, args.width), ReLU(), Dense(args.width, args.width), ReLU(),
+       Dense(args.width, 10)],
+      loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+      reuse_buffers=True, dtype=dtype, master_dtype=master_dtype, seed=0)
+    train = Dataset(X[:-2000], y[:-2000], batch=128, rng=model.spawn_rng())
+    start = time.perf_counter()
+    for _ in range(args.epochs):
+      model.train(train)
+    seconds = (time.perf_counter() - start) / args.epochs
+    loss, acc = model.test(test)
+    print("%-8s %14.3f %10.4f %10.4f" % (name, seconds, loss, acc))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Overhead of Sequential.profile on a deep narrow MLP.
+
+Usage: python -m benchmarks.profiler [--depth D] [--width W] [--steps S]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+
+def steps_per_second(model, X, y, steps):
+  """Return forward/backward/optimizer steps per second."""
+  start = time.perf_counter()
+  for _ in range(steps):
+    model.forward(X)
+    model.backward(y)
+    model.optimizer.apply_gradients(model.params)
+  return steps / (time.perf_counter() - start)
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--depth", type=int, default=32)
+  parser.add_argument("--width", type=int, default=16)
+  parser.add_argument("--steps", type=int, default=500)
+  args = parser.parse_args()
+
+  modules = []
+  for _ in range(args.depth):
+    modules += [Dense(args.width, args.width), ReLU()]
+  model = Sequential(
+    modules + [Dense(args.width, 10)], loss=SoftmaxCrossEntropy,
+    optimizer=SGD, lr_scheduler=ConstantLR, reuse_buffers=True)
+  X = np.random.randn(32, args.width)
+  y = np.random.randint(0, 10, size=32)
+
+  steps_per_second(model, X, y, args.steps // 10)
+  base = steps_per_second(model, X, y, args.steps)
+  print("%-22s %12s %10s" % ("mode", "steps / s", "overhead"))
+  print("%-22s %12.1f %9.1f%%" % ("disabled", base, 0.0))
+  for name, trace_memory in [("timing", False), ("timing + tracemalloc", True)]:
+    with model.profile(trace_memory=trace_memory):
+      rate = steps_per_second(model, X, y, args.steps)
+    print("%-22s %12.1f %9.1f%%" % (name, rate, 100 * (base / rate - 1)))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Compare the memory of float and int8-quantized models.
+
+An MLP is trained briefly on synthetic data, quantized with
+neural.quantization.quantize, and compared with the float64 model and a
+float32 copy. Weight bytes of the Dense layers are reported for each,
+followed by the calibration report of the int8 model against the float64
+one. Predict times are listed for reference only: the int8 matmul runs in
+float on BLAS, so quantization saves memory but not time.
+
+Usage: python -m benchmarks.quantization [--width W] [--batches B ...]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.quantization import QuantizedDense, quantize, calibration_report
+from neural.utils.data import Dataset
+
+from .precision import make_data
+
+def make_model(width, dtype, seed=0):
+  """Return a three layer MLP with the given hidden width."""
+  return Sequential(
+    [Dense(256, width), ReLU(), Dense(width, width), ReLU(),
+     Dense(width, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+    dtype=dtype, seed=seed)
+
+def seconds_per_predict(model, X, repeat):
+  """Return the fastest wall time of predict on X over repeat runs."""
+  model.predict(X)
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    model.predict(X)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def dense_bytes(model):
+  """Bytes held by the Dense layers of a float or quantized model."""
+  return sum(
+    module.nbytes if isinstance(module, QuantizedDense)
+      else sum(p.value.nbytes for p in module.trainable_parameters)
+    for module in model.modules)
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--width", type=int, default=1024)
+  parser.add_argument("--samples", type=int, default=10000)
+  parser.add_argument("--batches", type=int, nargs="+", default=[1, 32, 256])
+  parser.add_argument("--repeat", type=int, default=20)
+  args = parser.parse_args()
+
+  X, y = make_data(args.samples, 256, 10)
+  model = make_model(args.width, np.float64)
+  model.train(Dataset(X, y, batch=128, rng=model.spawn_rng()), callbacks=[])
+  single = make_model(args.width, np.float32)
+  for p, q in zip(model.params, single.params):
+    np.copyto(q.value, p.value, casting="same_kind")
+  quantized = quantize(model)
+  models = [("float64", model), ("float32", single), ("int8", quantized)]
+
+  print("%-8s %10s %12s" % ("model", "MB", "vs float64") + "".join(
+    " %12s" % ("ms @ %d" % batch) for batch in args.batches))
+  for name, m in models:
+    times = [seconds_per_predict(m, X[:batch], args.repeat)
+      for batch in args.batches]
+    print("%-8s %10.2f %11.1f%%" % (
+      name, dense_bytes(m) / 2 ** 20, dense_bytes(m) / dense_bytes(model)
+        * 100) + "".join(" %12.3f" % (t * 1e3) for t in times))
+  print("int8 saves memory only; its matmul runs in float, so it is not "
+    "faster than float32.")
+
+  print()
+  report = calibration_report(model, quantized, Dataset(X, y), 1000)
+  for key, value in report.items():
+    print("%-20s %s" % (key, value))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Serve concurrent single-sample requests with and without batching.
+
+Client threads send single data points as fast as they get answers. The
+baseline evaluates each request on its own with predict; the engine batches
+concurrent requests within a latency budget. Reports p50/p99 latency and
+throughput for each.
+
+Usage: python -m benchmarks.serving [--clients C] [--requests R]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from neural import Sequential, InferenceEngine
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+
+def serve(predict, X, clients):
+  """Send every row of X from clients threads; return per-request seconds
+  and the total wall time."""
+  latencies = np.empty(shape=X.shape[0])
+
+  def client(k):
+    for i in range(k, X.shape[0], clients):
+      start = time.perf_counter()
+      predict(X[i])
+      latencies[i] = time.perf_counter() - start
+
+  threads = [threading.Thread(target=client, args=(k,))
+    for k in range(clients)]
+  start = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return latencies, time.perf_counter() - start
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--clients", type=int, default=32)
+  parser.add_argument("--requests", type=int, default=20000)
+  parser.add_argument("--width", type=int, default=512)
+  parser.add_argument("--max-batch", type=int, default=64)
+  parser.add_argument("--max-latency", type=float, default=0.002)
+  args = parser.parse_args()
+
+  model = Sequential(
+    [Dense(args.width, args.width), ReLU(), Dense(args.width, args.width),
+      ReLU(), Dense(args.width, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR)
+  X = np.random.randn(args.requests, args.width)
+
+  print("%-10s %12s %12s %14s" % ("mode", "p50 (ms)", "p99 (ms)", "requests / s"))
+  latencies, elapsed = serve(
+    lambda x: model.predict(x[None]), X, args.clients)
+  p50, p99 = np.percentile(latencies, [50, 99])
+  print("%-10s %12.3f %12.3f %14.1f"
+    % ("unbatched", p50 * 1e3, p99 * 1e3, X.shape[0] / elapsed))
+
+  with InferenceEngine(
+      model, max_batch=args.max_batch,
+      max_latency=args.max_latency) as engine:
+    latencies, elapsed = serve(engine.predict, X, args.clients)
+    metrics = engine.metrics()
+  p50, p99 = np.percentile(latencies, [50, 99])
+  print("%-10s %12.3f %12.3f %14.1f"
+    % ("batched", p50 * 1e3, p99 * 1e3, X.shape[0] / elapsed))
+  print("mean batch size: %.1f" % metrics["mean_batch"])
+
+if __name__ == "__main__":
+  main()
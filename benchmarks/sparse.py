@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Compare sparse (CSR) and dense input to a Dense layer across sparsity.
+
+For each density a random batch is fed to the same layer as a CSRMatrix and
+as a dense array; forward plus backward time per batch is reported for both,
+along with the memory of each: the batch itself plus the peak traced by
+tracemalloc during a forward and backward pass. A second table times
+one Adam step on the layer's gradients from the sparse batch, updating
+every element or, in lazy mode, only the touched columns.
+
+Usage: python -m benchmarks.sparse [--features F] [--width W] [--batch B]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from neural import CSRMatrix
+from neural.nn import Dense
+from neural.optim import Adam
+
+def seconds_per_step(layer, x, grad, steps):
+  """Return the mean wall time of a forward and backward pass.
+
+  Sparse batches are re-sliced every step so that the per-batch column
+  grouping is timed as it is in training, where every batch is freshly
+  gathered.
+  """
+  layer.forward(x[:])
+  layer.backward(grad)
+  start = time.perf_counter()
+  for _ in range(steps):
+    layer.forward(x[:])
+    layer.backward(grad)
+  return (time.perf_counter() - start) / steps
+
+def bytes_per_step(layer, x, grad):
+  """Return the batch bytes plus the peak allocated by one step on it."""
+  if isinstance(x, CSRMatrix):
+    stored = x.data.nbytes + x.indices.nbytes + x.indptr.nbytes
+  else:
+    stored = x.nbytes
+  tracemalloc.start()
+  layer.forward(x[:])
+  layer.backward(grad)
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return stored + peak
+
+def seconds_per_update(layer, x, grad, lazy, steps):
+  """Return the mean wall time of an Adam step after a sparse batch."""
+  optimizer = Adam(lazy=lazy)
+  optimizer.initialize_params(layer.trainable_parameters)
+  layer.forward(x)
+  layer.backward(grad)
+  params = optimizer.arena.params
+  optimizer.apply_gradients(params)
+  start = time.perf_counter()
+  for _ in range(steps):
+    optimizer.apply_gradients(params)
+  return (time.perf_counter() - start) / steps
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--features", type=int, default=50000)
+  parser.add_argument("--width", type=int, default=128)
+  parser.add_argument("--batch", type=int, default=128)
+  parser.add_argument("--steps", type=int, default=10)
+  args = parser.parse_args()
+
+  layer = Dense(args.features, args.width)
+  grad = np.random.randn(args.batch, args.width)
+  print("%-9s %12s %12s %9s %12s %12s" % (
+    "density", "sparse ms", "dense ms", "speedup", "sparse MB", "dense MB"))
+  densities = [0.0001, 0.0005, 0.001, 0.01, 0.05, 0.2]
+  batches = []
+  for density in densities:
+    X = np.random.randn(args.batch, args.features)
+    X *= np.random.rand(args.batch, args.features) < density
+    S = CSRMatrix.from_dense(X)
+    batches.append(S)
+    sparse = seconds_per_step(layer, S, grad, args.steps)
+    dense = seconds_per_step(layer, X, grad, args.steps)
+    print("%-9g %12.2f %12.2f %8.1fx %12.2f %12.2f" % (
+      density, sparse * 1e3, dense * 1e3, dense / sparse,
+      bytes_per_step(layer, S, grad) / 2 ** 20,
+      bytes_per_step(layer, X, grad) / 2 ** 20))
+
+  print()
+  print("%-9s %12s %12s %9s" % ("density", "adam ms", "lazy ms", "speedup"))
+  for density, S in zip(densities, batches):
+    layer = Dense(args.features, args.width)
+    dense = seconds_per_update(layer, S, grad, False, args.steps)
+    lazy = seconds_per_update(layer, S, grad, True, args.steps)
+    print("%-9g %12.2f %12.2f %8.1fx" % (
+      density, dense * 1e3, lazy * 1e3, dense / lazy))
+
+if __name__ == "__main__":
+  main()
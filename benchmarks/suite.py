@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, Sigmoid, Tanh, ReLU, SoftmaxCrossEntropy
+from neural.nn import BatchNorm1d, LayerNorm, Dropout
+from neural.nn.images import Flatten, Conv2D, MaxPool2D, AvgPool2D
+from neural.nn.lazy import LazyDense
+from neural.optim import SGD, Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import Dataset, DataLoader
+
+from .harness import measure
+
+CLASSES = 10
+
+def module_benchmarks(batch, width, image_size, repeat):
+  """Forward and backward of every module at the given batch and width."""
+  vector = np.random.randn(batch, width)
+  image = np.random.randn(batch, 3, image_size, image_size)
+  labels = np.random.randint(0, CLASSES, size=batch)
+  cases = [
+    ("Dense", Dense(width, width), vector),
+    ("LazyDense", LazyDense(width), vector),
+    ("Sigmoid", Sigmoid(), vector),
+    ("Tanh", Tanh(), vector),
+    ("ReLU", ReLU(), vector),
+    ("BatchNorm1d", BatchNorm1d(width), vector),
+    ("LayerNorm", LayerNorm(width), vector),
+    ("Dropout", Dropout(0.5), vector),
+    ("Flatten", Flatten(), image),
+    ("Conv2D", Conv2D(3, 16, 3, padding=1), image),
+    ("MaxPool2D", MaxPool2D(2), image),
+    ("AvgPool2D", AvgPool2D(2), image),
+    ("SoftmaxCrossEntropy", SoftmaxCrossEntropy(),
+      np.random.randn(batch, CLASSES)),
+  ]
+  results = {}
+  for name, module, x in cases:
+    out = module.forward(x)
+    grad = labels if name == "SoftmaxCrossEntropy" else np.ones_like(out)
+    results["module.%s.forward" % name] = measure(
+      lambda: module.forward(x), repeat=repeat)
+    results["module.%s.backward" % name] = measure(
+      lambda: module.backward(grad), repeat=repeat)
+  return results
+
+def optimizer_benchmarks(width, layers, repeat):
+  """apply_gradients on a stack of Dense parameters."""
+  results = {}
+  for optim in [SGD, Adam]:
+    params = []
+    for _ in range(layers):
+      params += Dense(width, width).trainable_parameters
+    optimizer = optim()
+    optimizer.initialize_params(params)
+    for p in params:
+      p.grad[...] = np.random.randn(*p.grad.shape)
+    results["optimizer.%s.step" % optim.__name__] = measure(
+      lambda: optimizer.apply_gradients(params), repeat=repeat, number=10)
+  return results
+
+def data_benchmarks(samples, batch, width, repeat):
+  """Full passes over Dataset and DataLoader iterators."""
+  X = np.random.randn(samples, width)
+  y = np.random.randint(0, CLASSES, size=samples)
+  dataset = Dataset(X, y, batch=batch)
+  iterators = [
+    ("Dataset", dataset),
+    ("DataLoader", DataLoader(dataset)),
+    ("DataLoader.block", DataLoader(dataset, block_shuffle=True)),
+  ]
+  results = {}
+  for name, iterator in iterators:
+    results["data.%s.epoch" % name] = measure(
+      lambda: sum(1 for _ in iterator), repeat=repeat)
+  return results
+
+def train_benchmarks(samples, batch, width, repeat):
+  """Full Sequential.train epochs."""
+  X = np.random.randn(samples, width)
+  y = np.random.randint(0, CLASSES, size=samples)
+  dataset = Dataset(X, y, batch=batch)
+  results = {}
+  for name, reuse_buffers, compiled in [
+      ("eager", False, False), ("reuse_buffers", True, False),
+      ("compiled", True, True)]:
+    model = Sequential(
+      [Dense(width, width), ReLU(), Dense(width, width), Tanh(),
+       Dense(width, CLASSES)],
+      loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+      reuse_buffers=reuse_buffers, seed=0)
+    if compiled:
+      model.compile(batch_sizes=[batch])
+    results["train.%s.epoch" % name] = measure(
+      lambda: model.train(dataset), repeat=repeat)
+  return results
+
+def run(batch=64, width=256, image_size=32, samples=8192, layers=16,
+    repeat=5):
+  """Run the whole suite.
+
+  Parameters
+  ----------
+  batch : int
+    Batch size (defaults to 64).
+  width : int
+    Feature width of dense layers and data (defaults to 256).
+  image_size : int
+    Height and width of image inputs (defaults to 32).
+  samples : int
+    Dataset size for data and training benchmarks (defaults to 8192).
+  layers : int
+    Number of Dense layers for optimizer benchmarks (defaults to 16).
+  repeat : int
+    Timing samples per benchmark (defaults to 5).
+
+  Returns
+  -------
+  dict
+    Benchmark name to timing statistics.
+  """
+  results = {}
+  results.update(module_benchmarks(batch, width, image_size, repeat))
+  results.update(optimizer_benchmarks(width, layers, repeat))
+  results.update(data_benchmarks(samples, batch, width, repeat))
+  results.update(train_benchmarks(samples, batch, width, repeat))
+  return results
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Measure per-step allocations with and without module buffer reuse.
+
+Only the forward and backward passes are timed; the optimizer step is left
+out so the numbers reflect the layer kernels alone.
+
+Usage: python -m benchmarks.workspace [--batch B] [--width W] [--steps S]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, Sigmoid, Tanh, ReLU, SoftmaxCrossEntropy
+from neural.optim import SGD
+from neural.optim.lr_scheduler import ConstantLR
+
+def build_model(width, reuse_buffers):
+  """Build a four layer MLP of the given width."""
+  return Sequential(
+    [Dense(width, width), ReLU(), Dense(width, width), Tanh(),
+     Dense(width, width), Sigmoid(), Dense(width, 10)],
+    loss=SoftmaxCrossEntropy, optimizer=SGD, lr_scheduler=ConstantLR,
+    reuse_buffers=reuse_buffers)
+
+def step(model, X, y):
+  """Run one forward and backward pass."""
+  model.forward(X)
+  model.backward(y)
+
+def measure(model, X, y, steps):
+  """Return (seconds per step, mean transient peak bytes per step)."""
+  step(model, X, y)
+
+  start = time.perf_counter()
+  for _ in range(steps):
+    step(model, X, y)
+  seconds = (time.perf_counter() - start) / steps
+
+  peaks = []
+  tracemalloc.start()
+  for _ in range(steps):
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    step(model, X, y)
+    _, peak = tracemalloc.get_traced_memory()
+    peaks.append(peak - baseline)
+  tracemalloc.stop()
+  return seconds, np.mean(peaks)
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batch", type=int, default=256)
+  parser.add_argument("--width", type=int, default=512)
+  parser.add_argument("--steps", type=int, default=50)
+  args = parser.parse_args()
+
+  X = np.random.randn(args.batch, args.width)
+  y = np.eye(10)[np.random.randint(0, 10, size=args.batch)]
+
+  print("%-8s %12s %22s" % ("reuse", "ms / step", "allocated KiB / step"))
+  for reuse_buffers in [False, True]:
+    model = build_model(args.width, reuse_buffers)
+    seconds, peak = measure(model, X, y, args.steps)
+    print("%-8s %12.3f %22.1f" % (reuse_buffers, seconds * 1e3, peak / 2 ** 10))
+
+if __name__ == "__main__":
+  main()
@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 
 from .model import Sequential
+from .parallel import DataParallel
+from .serving import InferenceEngine
+from .sparse import CSRMatrix
+from .nn.base import no_grad, get_default_dtype, set_default_dtype
 
 __all__ = [
-  "Sequential"
+  "Sequential", "DataParallel", "InferenceEngine", "CSRMatrix",
+  "no_grad", "get_default_dtype", "set_default_dtype"
 ]
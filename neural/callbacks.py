@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import logging
+
+import numpy as np
+from tqdm import tqdm
+
+def scalars(logs):
+  """Keep the scalar entries of logs as floats."""
+  return {name: float(value) for name, value in logs.items()
+    if np.ndim(value) == 0}
+
+class Callback:
+  """Base class for sinks of the metrics reported during training."""
+  def on_epoch_begin(self, steps):
+    """Called before the first batch of an epoch.
+
+    Parameters
+    ----------
+    steps : int
+      Number of batches in the epoch.
+    """
+
+  def on_report(self, step, logs):
+    """Called every report interval with the running metrics.
+
+    Parameters
+    ----------
+    step : int
+      Number of batches trained so far in this epoch.
+    logs : dict
+      Metric name to result over those batches.
+    """
+
+  def on_epoch_end(self, logs):
+    """Called after the last batch of an epoch.
+
+    Parameters
+    ----------
+    logs : dict
+      Metric name to result over the whole epoch.
+    """
+
+class ProgressBar(Callback):
+  """Show training progress and scalar metrics with tqdm."""
+  def __init__(self):
+    self.pbar = None
+    self.step = 0
+
+  def on_epoch_begin(self, steps):
+    self.pbar = tqdm(total=steps)
+    self.step = 0
+
+  def on_report(self, step, logs):
+    self.pbar.update(step - self.step)
+    self.step = step
+    self.pbar.set_postfix(scalars(logs))
+
+  def on_epoch_end(self, logs):
+    self.pbar.update(self.pbar.total - self.step)
+    self.pbar.set_postfix(scalars(logs))
+    self.pbar.close()
+
+class LoggingCallback(Callback):
+  """Write scalar metrics to a logging.Logger.
+
+  Parameters
+  ----------
+  logger : logging.Logger
+    Destination (defaults to the "neural" logger).
+  level : int
+    Logging level of the records (defaults to logging.INFO).
+  """
+  def __init__(self, logger=None, level=logging.INFO):
+    self.logger = logging.getLogger("neural") if logger is None else logger
+    self.level = level
+    self.epoch = 0
+
+  def on_report(self, step, logs):
+    self.logger.log(self.level, "epoch %d step %d %s",
+      self.epoch, step, scalars(logs))
+
+  def on_epoch_end(self, logs):
+    self.logger.log(self.level, "epoch %d done %s",
+      self.epoch, scalars(logs))
+    self.epoch += 1
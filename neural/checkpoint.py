@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+def module_parameters(model):
+  """Return every parameter of model's modules, in module order."""
+  return [p for module in model.modules for p in module.trainable_parameters]
+
+def module_statistics(model):
+  """Return every statistic of model's modules, in module order."""
+  return [a for module in model.modules for a in module.statistics]
+
+def flat_values(model, params):
+  """Return the parameter values as one flat array.
+
+  The arena itself is returned when it holds exactly these parameters, so
+  callers must copy it before handing it to another thread.
+  """
+  arena = model.optimizer.arena
+  if arena is not None and arena.params == params:
+    return arena.value
+  if not params:
+    return np.empty(shape=0, dtype=model.dtype)
+  return np.concatenate([p.value.ravel() for p in params])
+
+def simple_state(obj):
+  """Collect the JSON-serializable attributes of obj.
+
+  Parameters
+  ----------
+  obj : object
+    Optimizer or learning rate scheduler.
+
+  Returns
+  -------
+  dict
+    Numbers, strings and lists of those, plus the states of any list of
+    nested objects, e.g. the schedulers of a ChainedScheduler.
+  """
+  state = {}
+  for key, value in vars(obj).items():
+    if isinstance(value, (bool, int, float, str)):
+      state[key] = value
+    elif isinstance(value, (np.integer, np.floating)):
+      state[key] = value.item()
+    elif isinstance(value, (list, tuple)) and all(
+        isinstance(v, (bool, int, float, str)) for v in value):
+      state[key] = list(value)
+    elif isinstance(value, list) and value and all(
+        hasattr(v, "__dict__") for v in value):
+      state[key] = [simple_state(v) for v in value]
+  return state
+
+def restore_simple_state(obj, state):
+  """Inverse of simple_state; nested objects are updated in place."""
+  for key, value in state.items():
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+      for nested, nested_state in zip(getattr(obj, key), value):
+        restore_simple_state(nested, nested_state)
+    else:
+      setattr(obj, key, value)
+
+class PendingSave:
+  """Handle of a checkpoint being written on a background thread.
+
+  Parameters
+  ----------
+  write : callable
+    Function that writes the checkpoint.
+  """
+  def __init__(self, write):
+    self.error = None
+    self.thread = threading.Thread(target=self.run, args=(write,), daemon=True)
+    self.thread.start()
+
+  def run(self, write):
+    try:
+      write()
+    except BaseException as e:
+      self.error = e
+
+  def done(self):
+    """Return whether the write has finished."""
+    return not self.thread.is_alive()
+
+  def wait(self):
+    """Block until the write has finished, re-raising any error."""
+    self.thread.join()
+    if self.error is not None:
+      raise self.error
+
+def save_checkpoint(model, path, background=False):
+  """Write the full training state of model to the directory path.
+
+  Parameters
+  ----------
+  model : Sequential
+    Model to save.
+  path : str
+    Destination directory; replaced only once the new checkpoint is fully
+    written.
+  background : bool
+    Snapshot the state in memory and write it on a background thread
+    (defaults to False).
+
+  Returns
+  -------
+  PendingSave or None
+    Handle of the background write, or None if the write has finished.
+
+  Notes:
+  ------
+  The directory holds meta.json, params.npy with every parameter value in
+  one contiguous uncompressed array, master.npy with the optimizer's master
+  weights under mixed precision, statistics.npy with the module statistics
+  (e.g. BatchNorm1d running averages) when there are any, and
+  optimizer.npy with the optimizer's per-parameter state (e.g. Adam's
+  moments) stacked as rows.
+
+  The checkpoint is written to path + ".tmp". The old directory is then
+  renamed to path + ".old", the new one renamed to path and the old one
+  deleted. A directory cannot be replaced by a single rename, so an
+  interrupted save may leave the previous checkpoint at path + ".old"
+  instead, where load_checkpoint finds it.
+  """
+  params = module_parameters(model)
+  optimizer = model.optimizer
+  optimizer.flush()
+  arena = optimizer.arena
+  arrays = {"params": flat_values(model, params)}
+  if arena is not None and arena.master is not arena.value:
+    arrays["master"] = arena.master
+  if background:
+    arrays = {name: array.copy() for name, array in arrays.items()}
+  statistics = module_statistics(model)
+  if statistics:
+    arrays["statistics"] = np.concatenate([a.ravel() for a in statistics])
+  if optimizer.slots:
+    arrays["optimizer"] = np.stack(
+      [getattr(optimizer, slot) for slot in optimizer.slots])
+
+  meta = {
+    "format": FORMAT_VERSION,
+    "dtype": model.dtype.str,
+    "shapes": [list(p.value.shape) for p in params],
+    "lazy": {str(i): module.trainable_parameters[0].value.shape[1]
+      for i, module in enumerate(model.modules)
+        if getattr(module, "initial_forward_pass", True) is False},
+    "optimizer": {
+      "type": type(optimizer).__name__,
+      "slots": list(optimizer.slots),
+      "state": simple_state(optimizer),
+    },
+    "lr_scheduler": {
+      "type": type(model.lr_scheduler).__name__,
+      "state": simple_state(model.lr_scheduler),
+    },
+  }
+
+  def write():
+    staging = path.rstrip(os.sep) + ".tmp"
+    backup = path.rstrip(os.sep) + ".old"
+    if os.path.exists(staging):
+      shutil.rmtree(staging)
+    os.makedirs(staging)
+    for name, array in arrays.items():
+      np.save(os.path.join(staging, name + ".npy"), array)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+      json.dump(meta, f)
+    if os.path.exists(path):
+      if os.path.exists(backup):
+        shutil.rmtree(backup)
+      os.rename(path, backup)
+    os.rename(staging, path)
+    if os.path.exists(backup):
+      shutil.rmtree(backup)
+
+  if background:
+    return PendingSave(write)
+  write()
+  return None
+
+def load_checkpoint(model, path, mmap=False):
+  """Restore the training state saved by save_checkpoint into model.
+
+  Parameters
+  ----------
+  model : Sequential
+    Model with the same modules as the saved one.
+  path : str
+    Checkpoint directory.
+  mmap : bool
+    Memory-map the weights read-only instead of copying them (defaults to
+    False). Intended for inference: the parameters become views of the
+    file, so loading is immediate and pages are read on first use.
+
+  Notes:
+  ------
+  If path is missing because a save was interrupted between its renames,
+  the previous checkpoint is loaded from path + ".old".
+  """
+  backup = path.rstrip(os.sep) + ".old"
+  if not os.path.exists(path) and os.path.exists(backup):
+    path = backup
+  with open(os.path.join(path, "meta.json")) as f:
+    meta = json.load(f)
+  assert(meta["format"] == FORMAT_VERSION)
+
+  initialized = False
+  for i, in_dim in meta["lazy"].items():
+    module = model.modules[int(i)]
+    if module.initial_forward_pass:
+      module.initialize(in_dim)
+      initialized = True
+  if initialized:
+    model.register_parameters()
+
+  params = module_parameters(model)
+  assert([list(p.value.shape) for p in params] == meta["shapes"])
+  values = np.load(
+    os.path.join(path, "params.npy"), mmap_mode="r" if mmap else None)
+  arena = model.optimizer.arena
+
+  if mmap:
+    assert(values.dtype == model.dtype)
+    if arena is not None and arena.params == params:
+      arena.rebind(value=values, copy=False)
+    else:
+      offset = 0
+      for p in params:
+        p.value = values[offset:offset + p.value.size].reshape(p.value.shape)
+        offset += p.value.size
+  else:
+    offset = 0
+    for p in params:
+      view = values[offset:offset + p.value.size].reshape(p.value.shape)
+      np.copyto(p.value, view, casting="same_kind")
+      offset += p.value.size
+
+  if arena is not None and arena.master is not arena.value:
+    master = os.path.join(path, "master.npy")
+    if os.path.exists(master):
+      np.copyto(arena.master, np.load(master))
+    else:
+      np.copyto(arena.master, arena.value)
+
+  statistics = module_statistics(model)
+  if statistics:
+    values = np.load(os.path.join(path, "statistics.npy"))
+    offset = 0
+    for a in statistics:
+      np.copyto(a, values[offset:offset + a.size].reshape(a.shape))
+      offset += a.size
+
+  optimizer = model.optimizer
+  assert(meta["optimizer"]["type"] == type(optimizer).__name__)
+  restore_simple_state(optimizer, meta["optimizer"]["state"])
+  if meta["optimizer"]["slots"]:
+    state = np.load(os.path.join(path, "optimizer.npy"))
+    for slot, array in zip(meta["optimizer"]["slots"], state):
+      np.copyto(getattr(optimizer, slot), array, casting="same_kind")
+
+  assert(meta["lr_scheduler"]["type"] == type(model.lr_scheduler).__name__)
+  restore_simple_state(model.lr_scheduler, meta["lr_scheduler"]["state"])
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from .nn.functional import log_softmax
+
+def class_indices(labels):
+  """Return integer class indices for one-hot or integer labels."""
+  labels = np.asarray(labels)
+  return np.argmax(labels, axis=1) if labels.ndim > 1 else labels
+
+class Metric:
+  """Base class for metrics accumulated over the batches of an epoch.
+
+  Attributes
+  ----------
+  name : str
+    Key of the metric in reported logs.
+  """
+  name = None
+
+  def reset(self):
+    """Clear the running state."""
+    raise NotImplementedError()
+
+  def update(self, logits, labels):
+    """Add a batch to the running state.
+
+    Parameters
+    ----------
+    logits : np.array
+      Softmax logits with shape (batch, num_classes).
+    labels : np.array
+      One-hot true labels with shape (batch, num_classes), or integer class
+      indices with shape (batch,).
+    """
+    raise NotImplementedError()
+
+  def update_from_loss(self, loss, labels):
+    """Add the batch of the last forward pass through a loss module.
+
+    Parameters
+    ----------
+    loss : Module
+      Loss module of the model, holding the logits of the pass.
+    labels : np.array
+      True labels of the pass, as in update.
+
+    Notes:
+    ------
+    Defaults to update with the logits; metrics that can reuse what the
+    loss module already computed override it.
+    """
+    self.update(loss.logits, labels)
+
+  def result(self):
+    """Return the metric over every batch since the last reset."""
+    raise NotImplementedError()
+
+class Loss(Metric):
+  """Mean cross entropy, computed from the logits.
+
+  Notes:
+  ------
+  During training the per-row losses of the loss module are summed instead,
+  which skips the log-softmax over the whole batch.
+  """
+  name = "loss"
+
+  def __init__(self):
+    self.reset()
+
+  def reset(self):
+    self.total = 0.0
+    self.count = 0
+
+  def update(self, logits, labels):
+    log_probs = log_softmax(logits)
+    if labels.ndim == 1:
+      self.total -= float(
+        np.sum(log_probs[np.arange(labels.shape[0]), labels]))
+    else:
+      self.total -= float(np.vdot(labels, log_probs))
+    self.count += logits.shape[0]
+
+  def update_from_loss(self, loss, labels):
+    if not hasattr(loss, "losses"):
+      return self.update(loss.logits, labels)
+    self.total += float(np.sum(loss.losses(labels)))
+    self.count += labels.shape[0]
+
+  def result(self):
+    return self.total / self.count if self.count else np.nan
+
+class Accuracy(Metric):
+  """Fraction of data points whose largest logit is the true class."""
+  name = "accuracy"
+
+  def __init__(self):
+    self.reset()
+
+  def reset(self):
+    self.hits = 0
+    self.count = 0
+
+  def update(self, logits, labels):
+    self.hits += np.count_nonzero(
+      np.argmax(logits, axis=1) == class_indices(labels))
+    self.count += logits.shape[0]
+
+  def result(self):
+    return self.hits / self.count if self.count else np.nan
+
+class TopKAccuracy(Metric):
+  """Fraction of data points whose true class is among the k largest logits.
+
+  Parameters
+  ----------
+  k : int
+    Number of top classes that count as a hit (defaults to 5).
+  """
+  def __init__(self, k=5):
+    assert(k > 0)
+    self.k = k
+    self.name = "top_%d_accuracy" % k
+    self.reset()
+
+  def reset(self):
+    self.hits = 0
+    self.count = 0
+
+  def update(self, logits, labels):
+    labels = class_indices(labels)
+    k = min(self.k, logits.shape[1])
+    true = logits[np.arange(labels.shape[0]), labels]
+    greater = np.count_nonzero(logits > true[:, None], axis=1)
+    self.hits += np.count_nonzero(greater < k)
+    self.count += logits.shape[0]
+
+  def result(self):
+    return self.hits / self.count if self.count else np.nan
+
+class ConfusionMatrix(Metric):
+  """Counts of true class (rows) against predicted class (columns).
+
+  Parameters
+  ----------
+  num_classes : int
+    Number of classes.
+  """
+  name = "confusion_matrix"
+
+  def __init__(self, num_classes):
+    self.num_classes = num_classes
+    self.reset()
+
+  def reset(self):
+    self.counts = np.zeros(
+      shape=self.num_classes * self.num_classes, dtype=np.int64)
+
+  def update(self, logits, labels):
+    cells = class_indices(labels) * self.num_classes
+    cells += np.argmax(logits, axis=1)
+    self.counts += np.bincount(cells, minlength=self.counts.size)
+
+  def result(self):
+    return self.counts.reshape(self.num_classes, self.num_classes).copy()
@@ -1,15 +1,25 @@
 #!/usr/bin/env python
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import numpy as np
-from tqdm import tqdm
 
-from .nn.base import Module
+from .nn.base import Module, no_grad, accumulate_grad, get_default_dtype
 from .nn.modules import SoftmaxCrossEntropy
+from .nn.functional import log_softmax
+from .nn.fused import FusedDense, fuse
+from .sparse import CSRMatrix
 from .optim import supported_optimizers
 from .optim.lr_scheduler import supported_lr_schedulers
 from .optim.lr_scheduler import ConstantLR
+from .profiler import Profiler
+from .checkpoint import save_checkpoint, load_checkpoint
+from .snapshot import WeightSnapshot
+from .metrics import Loss, Accuracy
+from .callbacks import ProgressBar
 
-def categorical_cross_entropy(pred, labels, epsilon=1e-10):
+def categorical_cross_entropy(pred, labels, epsilon=1e-10, reduce=True):
   """Cross entropy loss function.
 
   Parameters
@@ -17,34 +27,84 @@ def categorical_cross_entropy(pred, labels, epsilon=1e-10):
   pred : np.array
     Softmax label predictions. Should have shape (dim, num_classes).
   labels : np.array
-    One-hot true labels. Should have shape (dim, num_classes).
+    One-hot true labels with shape (dim, num_classes), or integer class
+    indices with shape (dim,).
   epsilon : float
     Small constant to add to the log term of cross entropy to help with
     numerical stability (defaults to 1e-10).
+  reduce : bool
+    Whether to average over the batch (defaults to True).
 
   Returns
   -------
-  float
-    Mean cross entropy loss in this batch.
+  float or np.array
+    Mean cross entropy loss in this batch, or the per-sample losses with
+    shape (dim,) if reduce is False.
   """
-  return np.mean(-np.sum(labels * np.log(pred + epsilon), axis=1))
+  if labels.ndim == 1:
+    losses = -np.log(pred[np.arange(pred.shape[0]), labels] + epsilon)
+  else:
+    labels = np.asarray(labels, dtype=pred.dtype)
+    losses = -np.sum(labels * np.log(pred + epsilon), axis=1)
+  return np.mean(losses) if reduce else losses
+
+def categorical_cross_entropy_from_logits(logits, labels, reduce=True):
+  """Cross entropy loss function evaluated on logits.
+
+  Parameters
+  ----------
+  logits : np.array
+    Softmax logits. Should have shape (dim, num_classes).
+  labels : np.array
+    One-hot true labels with shape (dim, num_classes), or integer class
+    indices with shape (dim,).
+  reduce : bool
+    Whether to average over the batch (defaults to True).
+
+  Returns
+  -------
+  float or np.array
+    Mean cross entropy loss in this batch, or the per-sample losses with
+    shape (dim,) if reduce is False.
 
-def categorical_accuracy(pred, labels):
+  Notes:
+  ------
+  Works on log_softmax(logits), so it needs no epsilon and stays exact for
+  confident wrong predictions, where categorical_cross_entropy saturates at
+  -log(epsilon).
+  """
+  log_probs = log_softmax(logits)
+  if labels.ndim == 1:
+    losses = -log_probs[np.arange(log_probs.shape[0]), labels]
+  else:
+    labels = np.asarray(labels, dtype=log_probs.dtype)
+    losses = -np.sum(labels * log_probs, axis=1)
+  return np.mean(losses) if reduce else losses
+
+def categorical_accuracy(pred, labels, reduce=True):
   """Accuracy statistic.
 
   Parameters
   ----------
   pred : np.array
-    Softmax label predictions. Should have shape (dim, num_classes).
+    Softmax label predictions or logits. Should have shape
+    (dim, num_classes).
   labels : np.array
-    One-hot true labels. Should have shape (dim, num_classes).
+    One-hot true labels with shape (dim, num_classes), or integer class
+    indices with shape (dim,).
+  reduce : bool
+    Whether to average over the batch (defaults to True).
 
   Returns
   -------
-  float
-    Mean accuracy in this batch.
+  float or np.array
+    Mean accuracy in this batch, or the per-sample hits with shape (dim,) if
+    reduce is False.
   """
-  return np.mean(np.argmax(pred, axis=1) == np.argmax(labels, axis=1))
+  if labels.ndim > 1:
+    labels = np.argmax(labels, axis=1)
+  hits = np.argmax(pred, axis=1) == labels
+  return np.mean(hits) if reduce else hits
 
 def instantiate_loss(loss):
   """Instantiate loss function.
@@ -115,15 +175,50 @@ class Sequential:
   Parameters
   ----------
   modules : Module[]
-    List of modules; used to grab trainable weights.
+    Modules in order, as a list, tuple or other iterable; copied into a list
+    and used to grab trainable weights.
   loss : Module
     Final output activation and loss function.
   optimizer : Optimizer
     Optimization policy.
   lr_scheduler : Scheduler
     Learning rate scheduler.
+  reuse_buffers : bool
+    Keep per-batch-shape workspaces in every module so that training steps
+    write into preallocated arrays instead of allocating new ones (defaults
+    to False). Arrays returned by forward are overwritten by the next step.
+  dtype : np.dtype
+    Data type of the forward and backward passes (defaults to
+    get_default_dtype()). Parameters of another dtype are cast on
+    construction, and inputs and labels are cast on entry.
+  master_dtype : np.dtype
+    Data type of the weights and state held by the optimizer (defaults to
+    dtype). For mixed precision use dtype=np.float32 and
+    master_dtype=np.float64.
+  seed : int
+    Root seed of the model's random streams (defaults to None, which draws
+    fresh entropy). Every module is given its own stream spawned from it,
+    and with a seed, modules whose parameters are still the unseeded
+    default draw are redrawn from their stream, so a seeded model is
+    reproducible. Parameters that were set by hand, loaded, or drawn from
+    an explicit rng are kept.
+  reinitialize : bool
+    Which modules redraw their parameters from their stream (defaults to
+    None, i.e. the untouched modules of a seeded model). True redraws every
+    module; False opts out and keeps every value the modules were created
+    with.
+
+  Notes:
+  ------
+  Random consumers never share a stream: datasets and worker threads
+  should draw theirs from spawn_rng, which yields statistically
+  independent generators in a reproducible order. The global np.random
+  state is never used, so np.random.seed has no effect; pass seed instead.
   """
-  def __init__(self, modules, loss=None, optimizer=None, lr_scheduler=None):
+  def __init__(
+      self, modules, loss=None, optimizer=None, lr_scheduler=None,
+      reuse_buffers=False, dtype=None, master_dtype=None, seed=None,
+      reinitialize=None):
     for module in modules:
       assert(isinstance(module, Module))
     assert(loss is not None)
@@ -142,19 +237,184 @@ class Sequential:
         ])
     )
 
-    self.modules = modules
+    self.modules = list(modules)
+    self.plan = self.modules
     self.loss = instantiate_loss(loss)
 
-    self.params = []
-    for module in modules:
-      self.params += module.trainable_parameters
-
+    self.seed_sequence = np.random.SeedSequence(seed)
+    streams = self.seed_sequence.spawn(len(self.modules))
+    for module, stream in zip(self.modules, streams):
+      if reinitialize is None:
+        redraw = seed is not None and module.has_default_parameters()
+      else:
+        redraw = reinitialize
+      if redraw:
+        module.reset_parameters(np.random.default_rng(stream))
+      else:
+        module.rng = np.random.default_rng(stream)
+
+    self.dtype = np.dtype(get_default_dtype() if dtype is None else dtype)
+    self.master_dtype = master_dtype
+    self.reuse_buffers = reuse_buffers
     self.optimizer = instantiate_optimizer(optimizer)
-    self.optimizer.initialize_params(self.params)
+    self.register_parameters()
 
     self.lr_scheduler = instantiate_lr_scheduler(lr_scheduler)
     self.lr_scheduler.set_optimizer(self.optimizer)
 
+    for module in self.modules + [self.loss]:
+      module.reuse_buffers(reuse_buffers)
+
+    self.profiler = None
+    self.pending_save = None
+
+  def spawn_rng(self):
+    """Return a new random stream derived from the model's root seed.
+
+    Returns
+    -------
+    np.random.Generator
+      Generator independent of every stream spawned before it, e.g. for a
+      Dataset or a worker thread.
+    """
+    return np.random.default_rng(self.seed_sequence.spawn(1)[0])
+
+  def register_parameters(self):
+    """Collect the parameters of every module into the optimizer's arena.
+
+    Notes:
+    ------
+    Parameters and statistics are cast to the model dtype, parameters are
+    packed in module order, and the optimizer state is reset. Called on
+    construction and again once lazy modules have created their parameters.
+    """
+    self.params = []
+    for module in self.modules:
+      self.params += module.trainable_parameters
+      module.statistics = [
+        np.asarray(a, dtype=self.dtype) for a in module.statistics]
+    for p in self.params:
+      p.value = np.asarray(p.value, dtype=self.dtype)
+    self.optimizer.initialize_params(
+      self.params, master_dtype=self.master_dtype)
+    self.built = not any(
+      getattr(module, "initial_forward_pass", False)
+        for module in self.modules)
+    if self.plan is not self.modules:
+      self.compile()
+
+  def build(self, input_shape):
+    """Infer every module's shapes and allocate all parameters up front.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      Shape of the logits of one data point.
+
+    Notes:
+    ------
+    Shapes are propagated through Module.build without running any data,
+    so lazy modules create their parameters here. All parameters are then
+    packed into one contiguous arena registered with the optimizer, giving
+    lazy models the same fused optimizer path as eager ones. A model with
+    lazy modules that was not built is built from the first batch it sees.
+    """
+    shape = tuple(input_shape)
+    for module in self.modules:
+      shape = module.build(shape)
+    self.register_parameters()
+    return shape
+
+  def compile(self, batch_sizes=()):
+    """Build a fused execution plan for forward, predict and backward.
+
+    Parameters
+    ----------
+    batch_sizes : int[]
+      Batch sizes to preallocate the fused arrays for (defaults to none;
+      they are then allocated on first use of each batch size).
+
+    Notes:
+    ------
+    Each Dense or initialized LazyDense followed by Sigmoid, Tanh or ReLU
+    runs as one FusedDense sharing its parameters, which halves the number
+    of steps and intermediate arrays per pair. Training steps write into
+    arrays planned per batch size, which are overwritten by the next step
+    as with reuse_buffers. Gradients are identical to the eager modules.
+    The original modules stay in self.modules; lazy modules are fused once
+    the model is built. Fused modules follow the model's reuse_buffers
+    setting on the paths that fall back to the generic Dense kernels.
+    """
+    self.plan = fuse(self.modules)
+    for module in self.plan:
+      if isinstance(module, FusedDense):
+        module.reuse_buffers(self.reuse_buffers)
+        for batch in batch_sizes:
+          module.plan(batch)
+
+  @contextmanager
+  def profile(self, trace_memory=False):
+    """Record per-module timings for the duration of a with block.
+
+    Parameters
+    ----------
+    trace_memory : bool
+      Also record bytes allocated per event with tracemalloc (defaults to
+      False).
+
+    Returns
+    -------
+    Profiler
+      The profiler, whose table() and export_chrome_trace() report what
+      ran inside the block.
+    """
+    profiler = Profiler(self, trace_memory=trace_memory)
+    self.profiler = profiler
+    profiler.start()
+    try:
+      yield profiler
+    finally:
+      profiler.stop()
+      self.profiler = None
+
+  def set_training(self, mode=True):
+    """Switch every module of the execution plan to training or evaluation.
+
+    Parameters
+    ----------
+    mode : bool
+      True for training, False for evaluation (defaults to True).
+
+    Notes:
+    ------
+    train switches to training and test to evaluation, so this is only
+    needed around direct calls to forward. predict always evaluates.
+    """
+    for module in self.plan:
+      module.set_training(mode)
+
+  def cast(self, X):
+    """Convert input data to the model dtype.
+
+    Parameters
+    ----------
+    X : np.array or CSRMatrix
+      Input data.
+
+    Returns
+    -------
+    np.array or CSRMatrix
+      X itself when it already has the model dtype.
+    """
+    if isinstance(X, CSRMatrix):
+      return X.astype(self.dtype, copy=False)
+    return np.asarray(X, dtype=self.dtype)
+
   def forward(self, X):
     """Model forward pass.
 
@@ -168,69 +428,394 @@ class Sequential:
     np.array
       Batch predictions; should have shape (batch, num_classes).
     """
-    for module in self.modules:
+    X = self.cast(X)
+    if not self.built:
+      self.build(X.shape[1:])
+    profiler = self.profiler
+    if profiler is not None:
+      for module in self.plan:
+        X = profiler.run(module, "forward", X)
+      return profiler.run(self.loss, "forward", X)
+    for module in self.plan:
       X = module.forward(X)
     return self.loss.forward(X)
 
-  def backward(self, y):
+  def predict(self, X, logits=False):
+    """Inference-only forward pass.
+
+    Parameters
+    ----------
+    X : np.array
+      Input data. Never modified.
+    logits : bool
+      Return the raw logits instead of the softmax probabilities (defaults to
+      False).
+
+    Returns
+    -------
+    np.array
+      Batch predictions; should have shape (batch, num_classes).
+
+    Notes:
+    ------
+    Runs under no_grad, so no module keeps references to its inputs or
+    outputs. Once the data flowing through the modules is a fresh array,
+    either cast to the model dtype or produced by a module with trainable
+    parameters, the remaining modules compute in place.
+    """
+    data = X
+    X = self.cast(X)
+    inplace = X is not data and isinstance(X, np.ndarray) and X.base is None
+    if not self.built:
+      self.build(X.shape[1:])
+    for module in self.plan:
+      with no_grad(inplace=inplace):
+        X = module.forward(X)
+      inplace = inplace or bool(module.trainable_parameters)
+    if logits:
+      return X
+    with no_grad(inplace=inplace):
+      return self.loss.forward(X)
+
+  def backward(self, y, scale=None):
     """Model backwards pass.
 
     Parameters
     ----------
     y : np.array
-      True labels.
+      True labels, one-hot or integer class indices.
+    scale : float
+      Factor applied to the loss gradient before it flows backwards
+      (defaults to None, i.e. no scaling).
     """
-    grad = self.loss.backward(y)
-    for module in reversed(self.modules):
+    y = np.asarray(y)
+    if y.ndim > 1:
+      y = y.astype(self.dtype, copy=False)
+    profiler = self.profiler
+    if profiler is not None:
+      grad = profiler.run(self.loss, "backward", y)
+    else:
+      grad = self.loss.backward(y)
+    if scale is not None:
+      grad *= scale
+    if profiler is not None:
+      for module in reversed(self.plan):
+        grad = profiler.run(module, "backward", grad)
+      return
+    for module in reversed(self.plan):
       grad = module.backward(grad)
 
-  def train(self, dataset):
+  def accumulate_gradients(self, X, y, micro_batches, metrics=None):
+    """Compute the gradients of one batch in several smaller passes.
+
+    Parameters
+    ----------
+    X : np.array
+      Input data of the batch.
+    y : np.array
+      True labels of the batch.
+    micro_batches : int
+      Number of slices the batch is split into.
+    metrics : Metric[]
+      Metrics updated with every slice (defaults to a fresh Loss and
+      Accuracy).
+
+    Returns
+    -------
+    tuple
+      Results of metrics after this batch; by default
+      [0] Mean loss over the batch.
+      [1] Mean accuracy over the batch.
+
+    Notes:
+    ------
+    The first slice overwrites Parameter.grad and later slices add to it.
+    Each slice's loss gradient is scaled by its share of the batch, so the
+    accumulated gradients equal those of a single pass over the whole batch
+    while activations are only held for one slice at a time.
+    """
+    n = X.shape[0]
+    assert(0 < micro_batches <= n)
+    if metrics is None:
+      metrics = [Loss(), Accuracy()]
+    q, r = divmod(n, micro_batches)
+    edges = [k * q + min(k, r) for k in range(micro_batches + 1)]
+    for k in range(micro_batches):
+      X_k, y_k = X[edges[k]:edges[k + 1]], y[edges[k]:edges[k + 1]]
+      self.forward(X_k)
+      for metric in metrics:
+        metric.update_from_loss(self.loss, y_k)
+      with accumulate_grad(k > 0):
+        self.backward(y_k, scale=X_k.shape[0] / n)
+    return tuple(metric.result() for metric in metrics)
+
+  def train(
+      self, dataset, micro_batches=1, metrics=None, callbacks=None,
+      report_every=50):
     """Fit model on dataset for a single epoch.
 
     Parameters
     ----------
     dataset : Dataset
       Training dataset with batches already split.
+    micro_batches : int
+      Number of slices each batch is split into for the forward and backward
+      passes (defaults to 1). Gradients are accumulated across the slices and
+      the optimizer steps once per batch, so peak activation memory scales
+      with the slice size while updates match full-batch training.
+    metrics : Metric[]
+      Metrics tracked in addition to the loss and accuracy (defaults to
+      none). They are reset at the start of the epoch.
+    callbacks : Callback[]
+      Sinks the running metrics are reported to (defaults to a single
+      ProgressBar). Pass an empty list to turn reporting off entirely.
+    report_every : int
+      Number of batches between reports (defaults to 50).
 
     Returns
     -------
     (float, float)
       [0] Mean train loss during this epoch.
       [1] Mean train accuracy during this epoch.
+
+    Notes:
+    ------
+    Metrics are running sums updated from the loss module after every pass,
+    and results are only formatted when reported, so the per-batch overhead
+    does not depend on the sinks. The built-in loss sums the per-row losses
+    of the loss module, which reuse the log-sum-exp of its softmax, so only
+    the accuracy's argmax is added to a step. Means are taken over data
+    points rather than batches. The model is switched to training first.
     """
-    losses = np.zeros(shape=dataset.size)
-    accuracy = np.zeros(shape=dataset.size)
-    with tqdm(
-        total=dataset.size,
-        postfix={"loss": 0, "accuracy": 0}) as pbar:
-      for i, batch in enumerate(dataset):
-        X, y = batch
-        pred = self.forward(X)
+    assert(report_every > 0)
+    self.set_training(True)
+    metrics = [Loss(), Accuracy()] + list(metrics or [])
+    for metric in metrics:
+      metric.reset()
+    callbacks = [ProgressBar()] if callbacks is None else callbacks
+    for callback in callbacks:
+      callback.on_epoch_begin(dataset.size)
+
+    profiler = self.profiler
+    batches = dataset if profiler is None else profiler.iterate(dataset)
+    for i, (X, y) in enumerate(batches):
+      if micro_batches == 1:
+        self.forward(X)
+        for metric in metrics:
+          metric.update_from_loss(self.loss, y)
         self.backward(y)
+      else:
+        self.accumulate_gradients(X, y, micro_batches, metrics=metrics)
+      if profiler is None:
         self.optimizer.apply_gradients(self.params)
+      else:
+        profiler.run(self.optimizer, "apply_gradients", self.params)
+
+      if callbacks and (i + 1) % report_every == 0:
+        logs = {metric.name: metric.result() for metric in metrics}
+        for callback in callbacks:
+          callback.on_report(i + 1, logs)
+    if profiler is None:
+      self.lr_scheduler.step()
+    else:
+      profiler.run(self.lr_scheduler, "step")
+
+    logs = {metric.name: metric.result() for metric in metrics}
+    for callback in callbacks:
+      callback.on_epoch_end(logs)
+    return logs["loss"], logs["accuracy"]
+
+  def fit(
+      self, dataset, epochs, validation=None, monitor=None, patience=None,
+      min_delta=0, restore_best=True, chunk_size=None, metrics=None,
+      callbacks=None, report_every=50):
+    """Fit model on dataset for several epochs.
+
+    Parameters
+    ----------
+    dataset : Dataset
+      Training dataset with batches already split.
+    epochs : int
+      Maximum number of epochs.
+    validation : Dataset
+      Validation dataset evaluated after every epoch (defaults to None).
+    monitor : str
+      Metric that decides the best epoch and early stopping: "loss",
+      "accuracy", "val_loss" or "val_accuracy" (defaults to "val_loss" with
+      a validation dataset and "loss" otherwise). Losses are minimized and
+      accuracies maximized.
+    patience : int
+      Stop after this many epochs without improvement of the monitored
+      metric (defaults to None, i.e. never stop early).
+    min_delta : float
+      Smallest change of the monitored metric that counts as an improvement
+      (defaults to 0).
+    restore_best : bool
+      Load the weights of the best epoch once fitting ends (defaults to
+      True).
+    chunk_size : int
+      Number of data points evaluated per validation forward pass (defaults
+      to the whole dataset).
+    metrics : Metric[]
+      Extra training metrics, as in train.
+    callbacks : Callback[]
+      Sinks of the training metrics, as in train.
+    report_every : int
+      Number of batches between reports, as in train (defaults to 50).
 
-        losses[i] = categorical_cross_entropy(pred, y)
-        accuracy[i] = categorical_accuracy(pred, y)
-        pbar.update(1)
-        pbar.set_postfix(loss=losses[i], accuracy=accuracy[i])
-    self.lr_scheduler.step()
-    return np.mean(losses), np.mean(accuracy)
-  
-  def test(self, dataset):
+    Returns
+    -------
+    dict[]
+      One record per trained epoch with the epoch index, loss, accuracy
+      and, with a validation dataset, val_loss and val_accuracy.
+
+    Notes:
+    ------
+    After each epoch the weights are copied into one of two flat
+    snapshots, and a background thread validates that snapshot through a
+    shadow copy of the modules while the next epoch trains. The best epoch
+    is kept by reserving its snapshot rather than copying the model, so
+    memory overhead is two copies of the weights. Because validation runs
+    alongside the next epoch, early stopping takes effect one epoch after
+    the decisive result; that extra epoch is still validated and reported.
+    Optimizer state is not restored.
+    """
+    assert(epochs > 0)
+    if monitor is None:
+      monitor = "val_loss" if validation is not None else "loss"
+    assert(monitor in ["loss", "accuracy", "val_loss", "val_accuracy"])
+    assert(validation is not None or not monitor.startswith("val_"))
+    sign = 1 if monitor.endswith("loss") else -1
+    if not self.built:
+      self.build(dataset.X.shape[1:])
+
+    snapshots = [WeightSnapshot(self), WeightSnapshot(self)]
+    best = None
+    best_score = np.inf
+    waiting = 0
+
+    def judge(record, snapshot):
+      nonlocal best, best_score, waiting
+      score = sign * record[monitor]
+      if best is None or score < best_score - min_delta:
+        best, best_score, waiting = snapshot, score, 0
+        return False
+      waiting += 1
+      return patience is not None and waiting >= patience
+
+    def settle(pending):
+      record, snapshot, future = pending
+      record["val_loss"], record["val_accuracy"] = future.result()
+      return judge(record, snapshot)
+
+    history = []
+    pending = None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+      stop = False
+      for epoch in range(epochs):
+        loss, accuracy = self.train(
+          dataset, metrics=metrics, callbacks=callbacks,
+          report_every=report_every)
+        record = {"epoch": epoch, "loss": loss, "accuracy": accuracy}
+        history.append(record)
+        if pending is not None:
+          stop, pending = settle(pending), None
+
+        snapshot = snapshots[0] if snapshots[0] is not best \
+          else snapshots[1]
+        snapshot.capture()
+        if validation is not None:
+          future = executor.submit(
+            snapshot.model.test, validation, chunk_size)
+          pending = (record, snapshot, future)
+        else:
+          stop = judge(record, snapshot)
+        if stop:
+          break
+      if pending is not None:
+        settle(pending)
+
+    if restore_best and best is not None:
+      best.restore()
+    return history
+
+  def test(self, dataset, chunk_size=None):
     """Compute test/validation loss for dataset.
 
     Parameters
     ----------
     dataset : Dataset
       Validation dataset with batches already split.
+    chunk_size : int
+      Number of data points evaluated per forward pass (defaults to the whole
+      dataset). Peak memory scales with this value.
 
     Returns
     -------
     (float, float)
       [0] Mean test loss.
       [1] Test accuracy.
+
+    Notes:
+    ------
+    The model is switched to evaluation first. Predictions go through
+    predict, so activations are not cached for backpropagation, and losses
+    are computed from the logits. Per-sample results are gathered before
+    averaging, so the numbers do not depend on chunk_size.
+    """
+    self.set_training(False)
+    n = dataset.X.shape[0]
+    losses = np.empty(shape=n, dtype=self.dtype)
+    hits = np.empty(shape=n, dtype=bool)
+    start = 0
+    for X, y in dataset.chunks(chunk_size):
+      stop = start + X.shape[0]
+      logits = self.predict(X, logits=True)
+      losses[start:stop] = categorical_cross_entropy_from_logits(
+        logits, y, reduce=False)
+      hits[start:stop] = categorical_accuracy(logits, y, reduce=False)
+      start = stop
+    return np.mean(losses), np.mean(hits)
+
+  def save(self, path, background=False):
+    """Save the weights, optimizer state and scheduler state to path.
+
+    Parameters
+    ----------
+    path : str
+      Checkpoint directory.
+    background : bool
+      Write on a background thread after an in-memory snapshot, so training
+      can resume right away (defaults to False).
+
+    Returns
+    -------
+    PendingSave or None
+      Handle whose wait() blocks until a background save has finished.
+
+    Notes:
+    ------
+    A background save still in flight is waited for before the next one
+    starts.
+    """
+    if self.pending_save is not None:
+      self.pending_save.wait()
+      self.pending_save = None
+    self.pending_save = save_checkpoint(self, path, background=background)
+    return self.pending_save
+
+  def load(self, path, mmap=False):
+    """Restore a checkpoint written by save.
+
+    Parameters
+    ----------
+    path : str
+      Checkpoint directory.
+    mmap : bool
+      Memory-map the weights read-only for inference instead of copying
+      them (defaults to False).
     """
-    pred = self.forward(dataset.X)
-    loss = categorical_cross_entropy(pred, dataset.y)
-    acc = categorical_accuracy(pred, dataset.y)
-    return loss, acc
+    if self.pending_save is not None:
+      self.pending_save.wait()
+      self.pending_save = None
+    load_checkpoint(self, path, mmap=mmap)
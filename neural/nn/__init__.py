@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 
 from .modules import Dense, Sigmoid, Tanh, ReLU
+from .modules import BatchNorm1d, LayerNorm, Dropout
 from .modules import SoftmaxCrossEntropy
 
 __all__ = [
   "Dense", "Sigmoid", "Tanh", "ReLU",
+  "BatchNorm1d", "LayerNorm", "Dropout",
   "SoftmaxCrossEntropy"
 ]
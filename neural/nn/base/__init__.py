@@ -1,7 +1,14 @@
 #!/usr/bin/env python
 
 from .base import Module, Parameter
+from .arena import ParameterArena
+from .dtype import get_default_dtype, set_default_dtype
+from .grad import no_grad, is_grad_enabled, is_inplace_enabled
+from .grad import accumulate_grad, is_grad_accumulating
 
 __all__ = [
-  "Module", "Parameter" 
+  "Module", "Parameter", "ParameterArena",
+  "get_default_dtype", "set_default_dtype",
+  "no_grad", "is_grad_enabled", "is_inplace_enabled",
+  "accumulate_grad", "is_grad_accumulating"
 ]
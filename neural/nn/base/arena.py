@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+class ParameterArena:
+  """Contiguous storage for a list of parameters.
+
+  Parameters
+  ----------
+  params : Parameter[]
+    Parameters to pack. Their value and grad attributes are replaced with
+    views into the flat arrays below.
+  master_dtype : np.dtype
+    Data type of the master copy of the values that optimizers update
+    (defaults to the dtype of the values themselves).
+
+  Attributes
+  ----------
+  params : Parameter[]
+    The packed parameters, in packing order.
+  value : np.array
+    Flat array holding every parameter value.
+  grad : np.array
+    Flat array holding every parameter gradient.
+  master : np.array
+    Flat master copy of value in master_dtype. This is value itself unless
+    master_dtype differs from the compute dtype; each parameter's view of it
+    is exposed as its master attribute.
+  """
+  def __init__(self, params, master_dtype=None):
+    self.params = params
+    dtype = np.result_type(*[p.value for p in params]) if params \
+      else np.float64
+
+    self.layout = []
+    offset = 0
+    for p in params:
+      self.layout.append((offset, offset + p.value.size, p.value.shape))
+      offset += p.value.size
+    self.size = offset
+
+    self.value = np.empty(shape=self.size, dtype=dtype)
+    self.grad = np.zeros(shape=self.size, dtype=dtype)
+    for p, value, grad in zip(
+        params, self.views(self.value), self.views(self.grad)):
+      value[...] = p.value
+      p.value = value
+      p.grad = grad
+
+    if master_dtype is None or np.dtype(master_dtype) == dtype:
+      self.master = self.value
+    else:
+      self.master = self.value.astype(master_dtype)
+    for p, master in zip(params, self.views(self.master)):
+      p.master = master
+
+  def views(self, flat):
+    """Split a flat array into per-parameter views.
+
+    Parameters
+    ----------
+    flat : np.array
+      Array with the same length as the arena.
+
+    Returns
+    -------
+    np.array[]
+      One view per parameter, shaped like that parameter.
+    """
+    return [flat[start:stop].reshape(shape)
+      for start, stop, shape in self.layout]
+
+  def rebind(self, value=None, grad=None, copy=True):
+    """Move the flat storage into other arrays, e.g. in shared memory.
+
+    Parameters
+    ----------
+    value : np.array
+      Flat array to hold the parameter values from now on.
+    grad : np.array
+      Flat array to hold the parameter gradients from now on.
+    copy : bool
+      Copy the current contents into the new arrays (defaults to True). With
+      False the new arrays are adopted as they are, e.g. weights memory-mapped
+      from a checkpoint.
+    """
+    if value is not None:
+      if copy:
+        value[...] = self.value
+      if self.master is self.value:
+        self.master = value
+        for p, master in zip(self.params, self.views(value)):
+          p.master = master
+      self.value = value
+      for p, view in zip(self.params, self.views(value)):
+        p.value = view
+    if grad is not None:
+      if copy:
+        grad[...] = self.grad
+      self.grad = grad
+      for p, view in zip(self.params, self.views(grad)):
+        p.grad = view
+
+  def zeros(self):
+    """Allocate a zeroed flat array for optimizer state.
+
+    Returns
+    -------
+    np.array
+      Flat array with the arena's length and master dtype.
+    """
+    return np.zeros_like(self.master)
+
+  def sync(self):
+    """Copy the master values into the compute values after an update."""
+    if self.master is not self.value:
+      np.copyto(self.value, self.master, casting="same_kind")
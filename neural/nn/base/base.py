@@ -1,5 +1,11 @@
 #!/usr/bin/env python
 
+import hashlib
+
+import numpy as np
+
+from .grad import is_grad_enabled, is_inplace_enabled
+
 class Parameter:
   """Container for a trainable parameter.
   
@@ -8,11 +14,16 @@ class Parameter:
   value: np.float64
     Parameter value.
   grad: np.float64
-    The gradient of the parameter with respect to the loss function.
+    The gradient of the parameter with respect to the loss function. Modules
+    write into this buffer in place.
+  touched: np.array
+    Columns of a 2-D grad that may be nonzero after a step on sparse input,
+    or None when every column may be.
   """
   def __init__(self, value):
     self.value = value
-    self.grad = None
+    self.grad = np.zeros_like(value)
+    self.touched = None
 
 class Module:
   """Base class for network layers and activation functions.
@@ -21,9 +32,155 @@ class Module:
   ----------
   self.trainable_parameters : Parameter[]
     List of parameters that can be trained in this module.
+  self.workspace : dict
+    Reusable buffers keyed by name and shape, or None when buffer reuse is
+    disabled.
+  self.statistics : np.array[]
+    Non-trainable state updated by training passes, e.g. running averages.
+    Updated in place; checkpoints and weight snapshots carry it alongside
+    the parameters.
+  self.training : bool
+    Whether forward passes with gradients enabled use training behaviour
+    (batch statistics, dropout) rather than evaluation behaviour.
+  self.rng : np.random.Generator
+    Random stream of the module, set by reset_parameters.
+  self.initial_digest : bytes
+    Digest of the parameters drawn from the module's default unseeded
+    stream, or None when they came from an explicit rng.
   """
   def __init__(self):
     self.trainable_parameters = []
+    self.statistics = []
+    self.workspace = None
+    self.training = True
+    self.rng = np.random.default_rng()
+    self.initial_digest = None
+
+  def reuse_buffers(self, enabled=True):
+    """Toggle buffer reuse for this module.
+
+    Parameters
+    ----------
+    enabled : bool
+      Whether forward and backward passes should write into persistent
+      per-shape buffers instead of allocating new arrays (defaults to True).
+
+    Notes:
+    ------
+    With reuse enabled, an array returned by forward or backward is
+    overwritten by the next call with the same batch shape.
+    """
+    self.workspace = {} if enabled else None
+
+  def buffer(self, name, shape, dtype=np.float64):
+    """Return an uninitialized array to write an intermediate result into.
+
+    Parameters
+    ----------
+    name : str
+      Name of the intermediate result.
+    shape : tuple
+      Shape of the array.
+    dtype : np.dtype
+      Data type of the array (defaults to np.float64).
+
+    Returns
+    -------
+    np.array
+      A persistent buffer when buffer reuse is enabled and gradients are being
+      tracked, otherwise a new array.
+    """
+    if self.workspace is None or not is_grad_enabled():
+      return np.empty(shape, dtype=dtype)
+    key = (name, shape, np.dtype(dtype))
+    buf = self.workspace.get(key)
+    if buf is None:
+      buf = self.workspace[key] = np.empty(shape, dtype=dtype)
+    return buf
+
+  def output_buffer(self, x):
+    """Return the array an elementwise forward pass should write into.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this module.
+
+    Returns
+    -------
+    np.array
+      x itself inside a no_grad(inplace=True) context, otherwise the buffer
+      named "out" shaped like x.
+    """
+    if is_inplace_enabled():
+      return x
+    return self.buffer("out", x.shape, x.dtype)
+
+  def build(self, input_shape):
+    """Infer the output shape and create shape-dependent parameters.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      Shape of one output, without the batch dimension. Modules that do not
+      change the shape return input_shape.
+    """
+    return tuple(input_shape)
+
+  def set_training(self, mode=True):
+    """Switch between training and evaluation behaviour.
+
+    Parameters
+    ----------
+    mode : bool
+      True for training, False for evaluation (defaults to True).
+
+    Notes:
+    ------
+    Forward passes under no_grad always behave as in evaluation, whatever
+    the mode, since they never train.
+    """
+    self.training = mode
+
+  def is_training(self):
+    """Return whether the current forward pass should train the module."""
+    return self.training and is_grad_enabled()
+
+  def parameter_digest(self):
+    """Return a digest of the current parameter values."""
+    digest = hashlib.blake2b(digest_size=16)
+    for p in self.trainable_parameters:
+      digest.update(np.ascontiguousarray(p.value).data)
+    return digest.digest()
+
+  def has_default_parameters(self):
+    """Return whether the parameters are still the unseeded default draw.
+
+    Returns
+    -------
+    bool
+      True when the parameters were drawn from the module's default stream
+      on construction and have not been modified since, so redrawing them
+      from a seeded stream discards nothing the caller chose.
+    """
+    return self.initial_digest is not None \
+      and self.initial_digest == self.parameter_digest()
+
+  def reset_parameters(self, rng):
+    """Redraw the parameters from rng and keep it for later random draws.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+      Stream owned by this module. Modules without random parameters only
+      keep it, for use by e.g. dropout masks.
+    """
+    self.rng = rng
 
   def forward(self, x):
     """Forward propagation.
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+_default_dtype = np.dtype(np.float64)
+
+def get_default_dtype():
+  """Return the dtype new parameters and models compute in.
+
+  Returns
+  -------
+  np.dtype
+    The current default floating point dtype (float64 unless changed).
+  """
+  return _default_dtype
+
+def set_default_dtype(dtype):
+  """Change the dtype new parameters and models compute in.
+
+  Parameters
+  ----------
+  dtype : np.dtype
+    Floating point dtype, e.g. np.float32 or np.float64.
+  """
+  global _default_dtype
+  dtype = np.dtype(dtype)
+  assert(np.issubdtype(dtype, np.floating))
+  _default_dtype = dtype
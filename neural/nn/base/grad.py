@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import threading
+from contextlib import contextmanager
+
+_state = threading.local()
+
+def is_grad_enabled():
+  """Return whether modules should cache activations for backpropagation.
+
+  Returns
+  -------
+  bool
+    False inside a no_grad context, True otherwise.
+  """
+  return getattr(_state, "grad_enabled", True)
+
+def is_inplace_enabled():
+  """Return whether modules may overwrite their inputs.
+
+  Returns
+  -------
+  bool
+    True inside a no_grad(inplace=True) context, False otherwise.
+  """
+  return getattr(_state, "inplace", False)
+
+@contextmanager
+def no_grad(inplace=False):
+  """Context in which forward passes skip caching state for backpropagation.
+
+  Parameters
+  ----------
+  inplace : bool
+    Allow modules to write their outputs into their inputs (defaults to
+    False). Only enable this when the caller owns the arrays flowing through
+    the modules.
+
+  Notes:
+  ------
+  The flags are thread-local, so evaluating in one thread does not affect
+  training in another.
+  """
+  previous = (is_grad_enabled(), is_inplace_enabled())
+  _state.grad_enabled = False
+  _state.inplace = inplace
+  try:
+    yield
+  finally:
+    _state.grad_enabled, _state.inplace = previous
+
+def is_grad_accumulating():
+  """Return whether backward passes should add to the parameter gradients.
+
+  Returns
+  -------
+  bool
+    True inside an accumulate_grad context, False otherwise.
+  """
+  return getattr(_state, "accumulate", False)
+
+@contextmanager
+def accumulate_grad(enabled=True):
+  """Context in which backward passes add into Parameter.grad in place.
+
+  Parameters
+  ----------
+  enabled : bool
+    Whether to accumulate (defaults to True); False overwrites as usual.
+
+  Notes:
+  ------
+  The flag is thread-local, like no_grad.
+  """
+  previous = is_grad_accumulating()
+  _state.accumulate = enabled
+  try:
+    yield
+  finally:
+    _state.accumulate = previous
@@ -1,9 +1,9 @@
 #!/usr/bin/env python
 
 from .functional import sigmoid, tanh, relu
-from .functional import softmax_cross_entropy
+from .functional import softmax_cross_entropy, log_softmax
 
 __all__ = [
   "sigmoid", "tanh", "relu",
-  "softmax_cross_entropy"
+  "softmax_cross_entropy", "log_softmax"
 ]
@@ -2,66 +2,123 @@
 
 import numpy as np
 
-def sigmoid(x):
+def sigmoid(x, out=None, workspace=None):
   """Functional version of Sigmoid Activation.
 
   Parameters
   ----------
   x : np.array
     Input data.
+  out : np.array
+    Optional array to write the result into; may be x itself.
+  workspace : np.array
+    Optional scratch array shaped like x, in the dtype of the result.
 
   Returns
   -------
   np.array
+
+  Notes:
+  ------
+  Evaluated as exp(min(x, 0)) / (1 + exp(-|x|)), i.e. 1 / (1 + exp(-x)) for
+  x >= 0 and exp(x) / (1 + exp(x)) for x < 0, so exp only sees non-positive
+  arguments: it never overflows and tiny outputs keep full relative
+  precision. With both out and workspace given nothing is allocated.
   """
-  fx = 1 / (1 + np.exp(-x))
+  denominator = np.abs(x, out=workspace)
+  np.negative(denominator, out=denominator)
+  np.exp(denominator, out=denominator)
+  denominator += 1
+  numerator = np.minimum(x, 0, out=out)
+  np.exp(numerator, out=numerator)
+  fx = np.divide(numerator, denominator, out=numerator)
   return fx
 
-def tanh(x):
+def tanh(x, out=None):
   """Functional version of Tanh Activation (Hyperbolic Tangent).
 
   Parameters
   ----------
   x : np.array
     Input data.
+  out : np.array
+    Optional array to write the result into; may be x itself.
 
   Returns
   -------
   np.array
   """
-  fx = np.divide(
-    np.exp(x) - np.exp(-x), np.exp(x) + np.exp(-x))
+  fx = np.tanh(x, out=out)
   return fx
 
-def relu(x):
+def relu(x, out=None):
   """Functional version of ReLU Activation (Rectified Linear Unit).
 
   Parameters
   ----------
   x : np.array
     Input data.
+  out : np.array
+    Optional array to write the result into; may be x itself.
 
   Returns
   -------
   np.array
   """
-  fx = np.copy(x)
-  fx[x <= 0] = 0
+  fx = np.maximum(x, 0, out=out)
   return fx
 
-def softmax_cross_entropy(logits):
+def softmax_cross_entropy(logits, out=None, lse=None):
   """Functional version of Softmax Cross Entropy.
 
   Parameters
   ----------
   logits : np.array
     Softmax logits.
+  out : np.array
+    Optional array to write the result into; may be logits itself.
+  lse : np.array
+    Optional array with shape (batch, 1) that receives the log-sum-exp of
+    each row of logits.
 
   Returns
   -------
   np.array
+
+  Notes:
+  ------
+  The log-sum-exp is the row maximum plus the log of the normalizer the
+  softmax already sums, so it costs one log per row. The cross entropy of a
+  row is its log-sum-exp minus the logit of the true class.
   """
-  exp_logits = np.exp(logits - np.max(logits, axis=1, keepdims=True))
-  y_pred = np.divide(
-    exp_logits, np.sum(exp_logits, axis=1, keepdims=True))
+  shift = np.max(logits, axis=1, keepdims=True)
+  exp_logits = np.subtract(logits, shift, out=out)
+  np.exp(exp_logits, out=exp_logits)
+  total = np.sum(exp_logits, axis=1, keepdims=True)
+  if lse is not None:
+    np.log(total, out=lse)
+    lse += shift
+  y_pred = np.divide(exp_logits, total, out=exp_logits)
   return y_pred
+
+def log_softmax(logits, out=None):
+  """Functional version of Log Softmax.
+
+  Parameters
+  ----------
+  logits : np.array
+    Softmax logits. Should have shape (batch, num_classes).
+  out : np.array
+    Optional array to write the result into; may be logits itself.
+
+  Returns
+  -------
+  np.array
+    Log probabilities, computed as the shifted logits minus their
+    log-sum-exp so that no probability is ever rounded to zero.
+  """
+  shifted = np.subtract(
+    logits, np.max(logits, axis=1, keepdims=True), out=out)
+  lse = np.log(np.sum(np.exp(shifted), axis=1, keepdims=True))
+  shifted -= lse
+  return shifted
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+
+from .modules import FusedDense
+from .plan import fuse
+
+__all__ = [
+  "FusedDense", "fuse"
+]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from ..base import is_grad_enabled, is_grad_accumulating
+from ..modules import Dense, Sigmoid, Tanh, ReLU
+from ..functional import sigmoid, tanh, relu
+from ...sparse import CSRMatrix
+
+class FusedDense(Dense):
+  """Dense layer followed by an activation, executed as one step.
+
+  Parameters
+  ----------
+  dense : Dense or LazyDense
+    Layer whose parameters are shared. A LazyDense must be initialized.
+  activation : Sigmoid, Tanh or ReLU
+    Activation applied to the layer output.
+
+  Attributes
+  ----------
+  plans : dict
+    Preallocated (out, dx, scratch) arrays keyed by batch size.
+
+  Notes:
+  ------
+  The bias add and the activation are applied in place on the matmul
+  output, and the activation derivative is applied in place on the incoming
+  gradient before the Dense gradients are computed, so the step keeps one
+  output array instead of two. Training steps write into the arrays planned
+  for their batch size without any per-call buffer lookups. Values and
+  gradients are bitwise identical to running the two modules separately;
+  inference and gradient accumulation take the generic Dense path.
+  """
+  kernels = {ReLU: relu, Sigmoid: sigmoid, Tanh: tanh}
+
+  def __init__(self, dense, activation):
+    assert(dense.trainable_parameters)
+    assert(type(activation) in self.kernels)
+    super(Dense, self).__init__()
+    self.trainable_parameters = dense.trainable_parameters
+    self.dense = dense
+    self.activation = activation
+    self.kernel = self.kernels[type(activation)]
+    self.plans = {}
+
+  def reset_parameters(self, rng):
+    """Redraw the shared parameters through the wrapped Dense layer."""
+    self.rng = rng
+    self.dense.reset_parameters(rng)
+
+  def plan(self, batch):
+    """Allocate the arrays used for a batch size.
+
+    Parameters
+    ----------
+    batch : int
+      Number of data points per forward and backward pass.
+
+    Returns
+    -------
+    (np.array, np.array, np.array)
+      [0] Output of the step, shaped (batch, out_dim).
+      [1] Gradient for the inputs, shaped (batch, in_dim).
+      [2] Activation derivative scratch, boolean for ReLU. Sigmoid also
+          uses it as its forward workspace.
+    """
+    W, _ = self.trainable_parameters
+    out_dim, in_dim = W.value.shape
+    dtype = W.value.dtype
+    scratch = bool if type(self.activation) is ReLU else dtype
+    plan = self.plans[batch] = (
+      np.empty((batch, out_dim), dtype=dtype),
+      np.empty((batch, in_dim), dtype=dtype),
+      np.empty((batch, out_dim), dtype=scratch))
+    return plan
+
+  def forward(self, x):
+    """Forward propagation through Dense and the activation.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer.
+
+    Returns
+    -------
+    np.array
+      Output of the activation.
+    """
+    W, b = self.trainable_parameters
+    if not is_grad_enabled() or isinstance(x, CSRMatrix) \
+        or x.dtype != W.value.dtype:
+      out = super().forward(x)
+      fx = self.kernel(out, out=out)
+    else:
+      plan = self.plans.get(x.shape[0]) or self.plan(x.shape[0])
+      fx = plan[0]
+      self.x = x
+      np.matmul(x, W.value.T, out=fx)
+      fx += b.value
+      if type(self.activation) is Sigmoid:
+        self.kernel(fx, out=fx, workspace=plan[2])
+      else:
+        self.kernel(fx, out=fx)
+    if is_grad_enabled():
+      self.fx = fx
+    return fx
+
+  def backward(self, grad):
+    """Backward propagation through the activation and Dense.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient flowing backwards from the next layer; overwritten with the
+      gradient w.r.t. the Dense output.
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer.
+    """
+    fx = self.fx
+    plan = self.plans.get(fx.shape[0])
+    if plan is None or plan[0] is not fx:
+      scratch = np.empty(fx.shape, dtype=bool \
+        if type(self.activation) is ReLU else fx.dtype)
+    else:
+      scratch = plan[2]
+    if type(self.activation) is ReLU:
+      np.greater(fx, 0, out=scratch)
+      np.multiply(grad, scratch, out=grad)
+    else:
+      if type(self.activation) is Sigmoid:
+        np.subtract(1, fx, out=scratch)
+        scratch *= fx
+      else:
+        np.square(fx, out=scratch)
+        np.subtract(1, scratch, out=scratch)
+      grad *= scratch
+    if plan is None or plan[0] is not fx or is_grad_accumulating():
+      return super().backward(grad)
+
+    W, b = self.trainable_parameters
+    x = self.x
+    batch = x.shape[0]
+    np.matmul(grad.T, x, out=W.grad)
+    W.grad /= batch
+    W.touched = None
+    np.sum(grad, axis=0, out=b.grad)
+    b.grad /= batch
+    np.matmul(grad, W.value, out=plan[1])
+    return plan[1]
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+from ..modules import Dense
+from ..lazy import LazyDense
+from .modules import FusedDense
+
+def fuse(modules):
+  """Build an execution plan with Dense-activation pairs fused.
+
+  Parameters
+  ----------
+  modules : Module[]
+    Modules of a Sequential model, in order.
+
+  Returns
+  -------
+  Module[]
+    Modules to run instead of modules. Every Dense or initialized LazyDense
+    directly followed by Sigmoid, Tanh or ReLU is replaced by one FusedDense
+    sharing its parameters; other modules are kept as they are.
+  """
+  plan = []
+  i = 0
+  while i < len(modules):
+    module = modules[i]
+    following = modules[i + 1] if i + 1 < len(modules) else None
+    if isinstance(module, (Dense, LazyDense)) and module.trainable_parameters \
+        and type(following) in FusedDense.kernels:
+      plan.append(FusedDense(module, following))
+      i += 2
+    else:
+      plan.append(module)
+      i += 1
+  return plan
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 
-from .modules import Flatten
+from .modules import Flatten, Conv2D, MaxPool2D, AvgPool2D
 
 __all__ = [
-  "Flatten"
+  "Flatten", "Conv2D", "MaxPool2D", "AvgPool2D"
 ]
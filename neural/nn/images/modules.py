@@ -1,6 +1,11 @@
 #!/usr/bin/env python
 
-from ..base import Module
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..base import Module, Parameter, is_grad_enabled, is_grad_accumulating
+from ..params.weights import Xavier
+from ..params.bias import Zero
 
 class Flatten(Module):
   """NumPy implementation of the Flatten Layer.
@@ -25,9 +30,25 @@ class Flatten(Module):
     np.array
       Output of this layer.
     """
-    self.shape = x.shape
+    if is_grad_enabled():
+      self.shape = x.shape
     return x.reshape(x.shape[0], -1)
 
+  def build(self, input_shape):
+    """Return the flattened output shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      (prod(input_shape),)
+    """
+    return (int(np.prod(input_shape)),)
+
   def backward(self, grad):
     """
     Backward propogation for Flatten.
@@ -45,3 +66,354 @@ class Flatten(Module):
       have dimensions (batch, dim).
     """
     return grad.reshape(self.shape)
+
+def pair(value):
+  """Expand an int into an (int, int) pair; pass pairs through."""
+  return (value, value) if isinstance(value, int) else tuple(value)
+
+def window_count(size, kernel_size, stride):
+  """Number of windows along each spatial dimension, as produced by
+  windows."""
+  return tuple((n - k) // s + 1
+    for n, k, s in zip(size, kernel_size, stride))
+
+def windows(x, kernel_size, stride):
+  """Strided (batch, channels, out_h, out_w, k_h, k_w) view of x's patches."""
+  (kh, kw), (sh, sw) = kernel_size, stride
+  view = sliding_window_view(x, (kh, kw), axis=(2, 3))
+  return view[:, :, ::sh, ::sw]
+
+class Conv2D(Module):
+  """NumPy implementation of the 2D Convolution Layer.
+
+  Parameters
+  ----------
+  in_channels : int
+    Number of input channels.
+  out_channels : int
+    Number of output channels.
+  kernel_size : int or (int, int)
+    Height and width of the kernel.
+  stride : int or (int, int)
+    Step between neighbouring windows (defaults to 1).
+  padding : int or (int, int)
+    Zero padding added to each side of the height and width (defaults to 0).
+  weight_initializer : WeightInitializer
+    Weight initialization method (defaults to Xavier).
+  bias_initializer : BiasInitializer
+    Bias initialization method (defaults to Zero).
+  dtype : np.dtype
+    Data type of the parameters (defaults to get_default_dtype()).
+  rng : np.random.Generator
+    Random number generator for the weights (defaults to a new unseeded
+    one, whose draw a seeded Sequential replaces).
+
+  Notes:
+  ------
+  Inputs have shape (batch, channels, height, width). The kernel is stored
+  as an (out_channels, in_channels * k_h * k_w) matrix, which is also what
+  the weight initializer sees. Patches are unrolled with im2col so that the
+  forward pass and each gradient are a single matrix product.
+  """
+  def __init__(
+      self, in_channels, out_channels, kernel_size, stride=1, padding=0,
+      weight_initializer=Xavier, bias_initializer=Zero, dtype=None, rng=None):
+    super().__init__()
+    self.kernel_size = pair(kernel_size)
+    self.stride = pair(stride)
+    self.padding = pair(padding)
+    self.weight_initializer = weight_initializer
+    self.bias_initializer = bias_initializer
+    if rng is not None:
+      self.rng = rng
+    fan_in = in_channels * self.kernel_size[0] * self.kernel_size[1]
+    W = weight_initializer(
+      fan_in, out_channels, dtype=dtype, rng=self.rng).initialize_params()
+    b = bias_initializer(out_channels, dtype=dtype).initialize_params()
+    self.trainable_parameters = [Parameter(W), Parameter(b)]
+    if rng is None:
+      self.initial_digest = self.parameter_digest()
+
+  def reset_parameters(self, rng):
+    """Redraw the kernel and bias in place from rng.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+      Stream owned by this layer.
+    """
+    self.rng = rng
+    W, b = self.trainable_parameters
+    out_channels, fan_in = W.value.shape
+    np.copyto(W.value, self.weight_initializer(
+      fan_in, out_channels, dtype=W.value.dtype, rng=rng).initialize_params())
+    np.copyto(b.value, self.bias_initializer(
+      out_channels, dtype=b.value.dtype).initialize_params())
+
+  def pad(self, x):
+    """Zero pad the spatial dimensions of x."""
+    ph, pw = self.padding
+    if not (ph or pw):
+      return x
+    B, C, H, W = x.shape
+    padded = self.buffer("padded", (B, C, H + 2 * ph, W + 2 * pw), x.dtype)
+    padded.fill(0)
+    padded[:, :, ph:ph + H, pw:pw + W] = x
+    return padded
+
+  def build(self, input_shape):
+    """Check the input shape and return the output shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      (channels, height, width) of one data point.
+
+    Returns
+    -------
+    tuple
+      (out_channels, out_height, out_width)
+    """
+    C, H, W = input_shape
+    (kh, kw), (ph, pw) = self.kernel_size, self.padding
+    kernel, _ = self.trainable_parameters
+    assert(kernel.value.shape[1] == C * kh * kw)
+    return (kernel.value.shape[0],) + window_count(
+      (H + 2 * ph, W + 2 * pw), self.kernel_size, self.stride)
+
+  def forward(self, x):
+    """Forward propagation through Conv2D.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer. Should have shape (batch, channels, height,
+      width).
+
+    Returns
+    -------
+    np.array
+      Output of this layer. Should have shape (batch, out_channels,
+      out_height, out_width).
+    """
+    W, b = self.trainable_parameters
+    padded = self.pad(x)
+    patches = windows(padded, self.kernel_size, self.stride)
+    B, C, OH, OW, kh, kw = patches.shape
+    cols = self.buffer("cols", (B, OH, OW, C, kh, kw), x.dtype)
+    np.copyto(cols, patches.transpose(0, 2, 3, 1, 4, 5))
+    cols = cols.reshape(B * OH * OW, C * kh * kw)
+    if is_grad_enabled():
+      self.x_shape = x.shape
+      self.padded_shape = padded.shape
+      self.cols = cols
+
+    out = self.buffer(
+      "out", (B * OH * OW, W.value.shape[0]), np.result_type(x, W.value))
+    np.matmul(cols, W.value.T, out=out)
+    out += b.value
+    return out.reshape(B, OH, OW, -1).transpose(0, 3, 1, 2)
+
+  def backward(self, grad):
+    """Backward propagation for Conv2D.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+      Should have shape (batch, out_channels, out_height, out_width).
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this module. Should have shape (batch,
+      channels, height, width).
+    """
+    W, b = self.trainable_parameters
+    B, O, OH, OW = grad.shape
+    (kh, kw), (sh, sw), (ph, pw) = self.kernel_size, self.stride, self.padding
+    C = self.x_shape[1]
+    g = self.buffer("g", (B, OH, OW, O), grad.dtype)
+    np.copyto(g, grad.transpose(0, 2, 3, 1))
+    g = g.reshape(B * OH * OW, O)
+
+    if is_grad_accumulating():
+      dW = self.buffer("dW", W.grad.shape, W.grad.dtype)
+      db = self.buffer("db", b.grad.shape, b.grad.dtype)
+    else:
+      dW, db = W.grad, b.grad
+    np.matmul(g.T, self.cols, out=dW)
+    dW /= B
+    np.sum(g, axis=0, out=db)
+    db /= B
+    if dW is not W.grad:
+      W.grad += dW
+      b.grad += db
+
+    dcols = self.buffer(
+      "dcols", (B * OH * OW, C * kh * kw), np.result_type(grad, W.value))
+    np.matmul(g, W.value, out=dcols)
+    dcols = dcols.reshape(B, OH, OW, C, kh, kw).transpose(0, 3, 1, 2, 4, 5)
+    dx = self.buffer("dx", self.padded_shape, dcols.dtype)
+    dx.fill(0)
+    for i in range(kh):
+      for j in range(kw):
+        dx[:, :, i:i + sh * OH:sh, j:j + sw * OW:sw] += dcols[..., i, j]
+    height, width = self.x_shape[2:]
+    return dx[:, :, ph:ph + height, pw:pw + width]
+
+class MaxPool2D(Module):
+  """NumPy implementation of the 2D Max Pooling Layer.
+
+  Parameters
+  ----------
+  kernel_size : int or (int, int)
+    Height and width of the pooling window.
+  stride : int or (int, int)
+    Step between neighbouring windows (defaults to kernel_size).
+  """
+  def __init__(self, kernel_size, stride=None):
+    super().__init__()
+    self.kernel_size = pair(kernel_size)
+    self.stride = self.kernel_size if stride is None else pair(stride)
+
+  def build(self, input_shape):
+    """Return the output shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      (channels, height, width) of one data point.
+
+    Returns
+    -------
+    tuple
+      (channels, out_height, out_width)
+    """
+    C, H, W = input_shape
+    return (C,) + window_count((H, W), self.kernel_size, self.stride)
+
+  def forward(self, x):
+    """Forward propagation through MaxPool2D.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer. Should have shape (batch, channels, height,
+      width).
+
+    Returns
+    -------
+    np.array
+      Output of this layer. Should have shape (batch, channels, out_height,
+      out_width).
+    """
+    patches = windows(x, self.kernel_size, self.stride)
+    if not is_grad_enabled():
+      return patches.max(axis=(4, 5))
+    B, C, OH, OW, kh, kw = patches.shape
+    flat = self.buffer("flat", (B, C, OH, OW, kh * kw), x.dtype)
+    np.copyto(flat, patches.reshape(B, C, OH, OW, kh * kw))
+    self.x_shape = x.shape
+    self.argmax = np.argmax(flat, axis=4)
+    return np.take_along_axis(flat, self.argmax[..., None], axis=4)[..., 0]
+
+  def backward(self, grad):
+    """Backward propagation for MaxPool2D.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+      Should have shape (batch, channels, out_height, out_width).
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer; each window's gradient goes to
+      its maximum. Should have shape (batch, channels, height, width).
+    """
+    (kh, kw), (sh, sw) = self.kernel_size, self.stride
+    OH, OW = grad.shape[2:]
+    dx = self.buffer("dx", self.x_shape, grad.dtype)
+    dx.fill(0)
+    for i in range(kh):
+      for j in range(kw):
+        dx[:, :, i:i + sh * OH:sh, j:j + sw * OW:sw] += \
+          grad * (self.argmax == i * kw + j)
+    return dx
+
+class AvgPool2D(Module):
+  """NumPy implementation of the 2D Average Pooling Layer.
+
+  Parameters
+  ----------
+  kernel_size : int or (int, int)
+    Height and width of the pooling window.
+  stride : int or (int, int)
+    Step between neighbouring windows (defaults to kernel_size).
+  """
+  def __init__(self, kernel_size, stride=None):
+    super().__init__()
+    self.kernel_size = pair(kernel_size)
+    self.stride = self.kernel_size if stride is None else pair(stride)
+
+  def build(self, input_shape):
+    """Return the output shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      (channels, height, width) of one data point.
+
+    Returns
+    -------
+    tuple
+      (channels, out_height, out_width)
+    """
+    C, H, W = input_shape
+    return (C,) + window_count((H, W), self.kernel_size, self.stride)
+
+  def forward(self, x):
+    """Forward propagation through AvgPool2D.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer. Should have shape (batch, channels, height,
+      width).
+
+    Returns
+    -------
+    np.array
+      Output of this layer. Should have shape (batch, channels, out_height,
+      out_width).
+    """
+    if is_grad_enabled():
+      self.x_shape = x.shape
+    return windows(x, self.kernel_size, self.stride).mean(axis=(4, 5))
+
+  def backward(self, grad):
+    """Backward propagation for AvgPool2D.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+      Should have shape (batch, channels, out_height, out_width).
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer. Should have shape (batch,
+      channels, height, width).
+    """
+    (kh, kw), (sh, sw) = self.kernel_size, self.stride
+    OH, OW = grad.shape[2:]
+    share = grad / (kh * kw)
+    dx = self.buffer("dx", self.x_shape, grad.dtype)
+    dx.fill(0)
+    for i in range(kh):
+      for j in range(kw):
+        dx[:, :, i:i + sh * OH:sh, j:j + sw * OW:sw] += share
+    return dx
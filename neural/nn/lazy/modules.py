@@ -2,9 +2,11 @@
 
 import numpy as np
 
-from ..base import Module, Parameter
+from ..base import Module, Parameter, get_default_dtype
+from ..base import is_grad_enabled, is_grad_accumulating
 from ..params.weights import Xavier
 from ..params.bias import Zero
+from ...sparse import CSRMatrix, sparse_linear, sparse_weight_grad
 
 class LazyDense(Module):
   """NumPy implementation of the LazyDense Layer.
@@ -17,26 +19,91 @@ class LazyDense(Module):
     Weight initialization method (defaults to Xavier).
   bias_initializer : BiasInitializer
     Bias initialization method (defaults to Zero).
+  dtype : np.dtype
+    Data type of the parameters (defaults to get_default_dtype()).
+  rng : np.random.Generator
+    Random number generator for the weights (defaults to a new unseeded
+    one, which a Sequential replaces by its own stream before the weights
+    are drawn).
 
   Notes:
   ------
   Lazy initialization of the in_dim argument. The in_dim argument is infered
-  from the initial forward pass.
+  by build, or from the initial forward pass otherwise. Sequential.build
+  creates the parameters before training so that the optimizer sees them.
   """
   def __init__(
-      self, out_dim, weight_initializer=Xavier, bias_initializer=Zero):
+      self, out_dim, weight_initializer=Xavier, bias_initializer=Zero,
+      dtype=None, rng=None):
+    super().__init__()
+    if rng is not None:
+      self.rng = rng
     self.initial_forward_pass = True
     self.out_dim = out_dim
     self.weight_initializer = weight_initializer
     self.bias_initializer = bias_initializer
+    self.dtype = get_default_dtype() if dtype is None else dtype
+
+  def initialize(self, in_dim):
+    """Create the parameters once the input dimension is known.
+
+    Parameters
+    ----------
+    in_dim : int
+      Length of input dimensions.
+    """
+    W = self.weight_initializer(
+      in_dim, self.out_dim, dtype=self.dtype, rng=self.rng).initialize_params()
+    b = self.bias_initializer(
+      self.out_dim, dtype=self.dtype).initialize_params()
+    self.trainable_parameters = [Parameter(W), Parameter(b)]
+    self.initial_forward_pass = False
+
+  def reset_parameters(self, rng):
+    """Keep rng for the weights, redrawing them if already created.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+      Stream owned by this layer.
+    """
+    self.rng = rng
+    if not self.initial_forward_pass:
+      W, b = self.trainable_parameters
+      np.copyto(W.value, self.weight_initializer(
+        W.value.shape[1], self.out_dim, dtype=self.dtype,
+        rng=rng).initialize_params())
+      np.copyto(b.value, self.bias_initializer(
+        self.out_dim, dtype=self.dtype).initialize_params())
+
+  def build(self, input_shape):
+    """Create the parameters from the input shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      (out_dim,)
+    """
+    assert(len(input_shape) == 1)
+    if self.initial_forward_pass:
+      self.initialize(input_shape[0])
+    else:
+      assert(self.trainable_parameters[0].value.shape[1] == input_shape[0])
+    return (self.out_dim,)
 
   def forward(self, x):
     """Forward propagation through LazyDense.
 
     Parameters
     ----------
-    x : np.array
-      Input for this layer.
+    x : np.array or CSRMatrix
+      Input for this layer. Sparse input is multiplied without densifying
+      and its weight gradient only touches the active columns.
   
     Returns
     -------
@@ -44,14 +111,19 @@ class LazyDense(Module):
       Output of this layer.
     """
     if self.initial_forward_pass:
-      in_dim, _ = x.shape
-      W = self.weight_initializer(in_dim, self.out_dim).initialize_params()
-      b = self.bias_initializer(self.out_dim).initialize_params()
-      self.trainable_parameters = [Parameter(W), Parameter(b)]
-      self.initial_forward_pass = False
-    self.x = x
+      self.initialize(x.shape[1])
+    if is_grad_enabled():
+      self.x = x
     W, b = self.trainable_parameters
-    return np.tensordot(W.value, x, axes=[1, 1]).T + b.value
+    out = self.buffer(
+      "out", (x.shape[0], W.value.shape[0]),
+      np.result_type(x.dtype, W.value.dtype))
+    if isinstance(x, CSRMatrix):
+      sparse_linear(x, W.value, out=out)
+    else:
+      np.matmul(x, W.value.T, out=out)
+    out += b.value
+    return out
 
   def backward(self, grad):
     """Backward propagation for LazyDense.
@@ -66,11 +138,28 @@ class LazyDense(Module):
     -------
     np.array
       Gradients for the inputs to this module. Should have dimensions
-      (batch, dim).
+      (batch, dim). None for sparse input, which has no upstream module.
     """
     W, b = self.trainable_parameters
     batch = self.x.shape[0]
-    W.grad = np.matmul(grad.T, self.x) / batch
-    b.grad = np.sum(grad, axis=0) / batch
-    dx = np.matmul(grad, W.value)
+    accumulate = is_grad_accumulating()
+    db = self.buffer("db", b.grad.shape, b.grad.dtype) if accumulate \
+      else b.grad
+    np.sum(grad, axis=0, out=db)
+    db /= batch
+    if db is not b.grad:
+      b.grad += db
+    if isinstance(self.x, CSRMatrix):
+      sparse_weight_grad(self.x, grad, W, accumulate)
+      return None
+    dW = self.buffer("dW", W.grad.shape, W.grad.dtype) if accumulate \
+      else W.grad
+    np.matmul(grad.T, self.x, out=dW)
+    dW /= batch
+    if dW is not W.grad:
+      W.grad += dW
+    W.touched = None
+    dx = self.buffer(
+      "dx", self.x.shape, np.result_type(grad, W.value))
+    np.matmul(grad, W.value, out=dx)
     return dx
@@ -2,11 +2,13 @@
 
 import numpy as np
 
-from .base import Module, Parameter
+from .base import Module, Parameter, is_grad_enabled, is_grad_accumulating
+from .base import get_default_dtype
 from .functional import sigmoid, tanh, relu
 from .functional import softmax_cross_entropy
 from .params.weights import Xavier
 from .params.bias import Zero
+from ..sparse import CSRMatrix, sparse_linear, sparse_weight_grad
 
 class Dense(Module):
   """NumPy implementation of the Dense Layer.
@@ -21,29 +23,86 @@ class Dense(Module):
     Weight initialization method (defaults to Xavier).
   bias_initializer : BiasInitializer
     Bias initialization method (defaults to Zero).
+  dtype : np.dtype
+    Data type of the parameters (defaults to get_default_dtype()).
+  rng : np.random.Generator
+    Random number generator for the weights (defaults to a new unseeded
+    one, whose draw a seeded Sequential replaces).
   """
   def __init__(
-      self, in_dim, out_dim, weight_initializer=Xavier, bias_initializer=Zero):
-    W = weight_initializer(in_dim, out_dim).initialize_params()
-    b = bias_initializer(out_dim).initialize_params()
+      self, in_dim, out_dim, weight_initializer=Xavier, bias_initializer=Zero,
+      dtype=None, rng=None):
+    super().__init__()
+    self.weight_initializer = weight_initializer
+    self.bias_initializer = bias_initializer
+    if rng is not None:
+      self.rng = rng
+    W = weight_initializer(
+      in_dim, out_dim, dtype=dtype, rng=self.rng).initialize_params()
+    b = bias_initializer(out_dim, dtype=dtype).initialize_params()
     self.trainable_parameters = [Parameter(W), Parameter(b)]
+    if rng is None:
+      self.initial_digest = self.parameter_digest()
+
+  def reset_parameters(self, rng):
+    """Redraw the weights and bias in place from rng.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+      Stream owned by this layer.
+    """
+    self.rng = rng
+    W, b = self.trainable_parameters
+    out_dim, in_dim = W.value.shape
+    np.copyto(W.value, self.weight_initializer(
+      in_dim, out_dim, dtype=W.value.dtype, rng=rng).initialize_params())
+    np.copyto(b.value, self.bias_initializer(
+      out_dim, dtype=b.value.dtype).initialize_params())
+
+  def build(self, input_shape):
+    """Check the input shape and return the output shape.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      (out_dim,)
+    """
+    W, _ = self.trainable_parameters
+    assert(tuple(input_shape) == (W.value.shape[1],))
+    return (W.value.shape[0],)
 
   def forward(self, x):
     """Forward propagation through Dense.
 
     Parameters
     ----------
-    x : np.array
-      Input for this layer.
+    x : np.array or CSRMatrix
+      Input for this layer. Sparse input is multiplied without densifying
+      and its weight gradient only touches the active columns.
   
     Returns
     -------
     np.array
       Output of this layer.
     """
-    self.x = x
+    if is_grad_enabled():
+      self.x = x
     W, b = self.trainable_parameters
-    return np.tensordot(W.value, x, axes=[1, 1]).T + b.value
+    out = self.buffer(
+      "out", (x.shape[0], W.value.shape[0]),
+      np.result_type(x.dtype, W.value.dtype))
+    if isinstance(x, CSRMatrix):
+      sparse_linear(x, W.value, out=out)
+    else:
+      np.matmul(x, W.value.T, out=out)
+    out += b.value
+    return out
 
   def backward(self, grad):
     """Backward propagation for Dense.
@@ -58,13 +117,30 @@ class Dense(Module):
     -------
     np.array
       Gradients for the inputs to this module. Should have dimensions
-      (batch, dim).
+      (batch, dim). None for sparse input, which has no upstream module.
     """
     W, b = self.trainable_parameters
     batch = self.x.shape[0]
-    W.grad = np.matmul(grad.T, self.x) / batch
-    b.grad = np.sum(grad, axis=0) / batch
-    dx = np.matmul(grad, W.value)
+    accumulate = is_grad_accumulating()
+    db = self.buffer("db", b.grad.shape, b.grad.dtype) if accumulate \
+      else b.grad
+    np.sum(grad, axis=0, out=db)
+    db /= batch
+    if db is not b.grad:
+      b.grad += db
+    if isinstance(self.x, CSRMatrix):
+      sparse_weight_grad(self.x, grad, W, accumulate)
+      return None
+    dW = self.buffer("dW", W.grad.shape, W.grad.dtype) if accumulate \
+      else W.grad
+    np.matmul(grad.T, self.x, out=dW)
+    dW /= batch
+    if dW is not W.grad:
+      W.grad += dW
+    W.touched = None
+    dx = self.buffer(
+      "dx", self.x.shape, np.result_type(grad, W.value))
+    np.matmul(grad, W.value, out=dx)
     return dx
 
 class Sigmoid(Module):
@@ -85,9 +161,11 @@ class Sigmoid(Module):
     np.array
       Output of this layer.
     """
-    self.x = x
-    fx = sigmoid(x)
-    self.fx = fx
+    fx = sigmoid(x, out=self.output_buffer(x),
+      workspace=self.buffer("denominator", x.shape, x.dtype))
+    if is_grad_enabled():
+      self.x = x
+      self.fx = fx
     return fx
 
   def backward(self, grad):
@@ -106,7 +184,10 @@ class Sigmoid(Module):
       Gradients for the inputs to this layer, dL/dx_{k-1}. Should
       have dimensions (batch, dim).
     """
-    dLdx = grad * (self.fx * (1 - self.fx))
+    dLdx = self.buffer("dx", grad.shape, grad.dtype)
+    np.subtract(1, self.fx, out=dLdx)
+    dLdx *= self.fx
+    dLdx *= grad
     return dLdx
 
 class Tanh(Module):
@@ -127,9 +208,10 @@ class Tanh(Module):
     np.array
       Output of this layer.
     """
-    self.x = x
-    fx = tanh(x)
-    self.fx = fx
+    fx = tanh(x, out=self.output_buffer(x))
+    if is_grad_enabled():
+      self.x = x
+      self.fx = fx
     return fx
 
   def backward(self, grad):
@@ -148,7 +230,10 @@ class Tanh(Module):
       Gradients for the inputs to this layer, dL/dx_{k-1}. Should
       have dimensions (batch, dim).
     """
-    dLdx = grad * (1 - np.square(self.fx))
+    dLdx = self.buffer("dx", grad.shape, grad.dtype)
+    np.square(self.fx, out=dLdx)
+    np.subtract(1, dLdx, out=dLdx)
+    dLdx *= grad
     return dLdx
 
 class ReLU(Module):
@@ -169,8 +254,9 @@ class ReLU(Module):
     np.array
       Output of this layer.
     """
-    self.x = x
-    fx = relu(x)
+    if is_grad_enabled():
+      self.x = x
+    fx = relu(x, out=self.output_buffer(x))
     return fx
 
   def backward(self, grad):
@@ -189,11 +275,341 @@ class ReLU(Module):
       Gradients for the inputs to this layer, dL/dx_{k-1}. Should
       have dimensions (batch, dim).
     """
-    dxdx = np.ones_like(self.x)
-    dxdx[self.x <= 0] = 0
-    dLdx = grad * dxdx
+    dxdx = self.buffer("mask", self.x.shape, bool)
+    np.greater(self.x, 0, out=dxdx)
+    dLdx = self.buffer("dx", grad.shape, grad.dtype)
+    np.multiply(grad, dxdx, out=dLdx)
     return dLdx
 
+class BatchNorm1d(Module):
+  """Batch normalization over the features of (batch, dim) inputs.
+
+  Parameters
+  ----------
+  dim : int
+    Number of features.
+  momentum : float
+    Weight of each training batch in the running statistics (defaults to
+    0.1).
+  epsilon : float
+    A small constant added to the variance for numerical stability
+    (defaults to 1e-5).
+  dtype : np.dtype
+    Data type of the parameters and statistics (defaults to
+    get_default_dtype()).
+
+  Notes:
+  ------
+  Training passes take the mean and variance of the batch from a single
+  pass of sums and sums of squares, accumulated in float64, and fold them
+  into the running mean and variance kept in self.statistics. Evaluation
+  normalizes with the running statistics; without gradients they are
+  folded with gamma and beta into one scale and shift applied in place.
+  Under accumulate_gradients every micro-batch is normalized with its own
+  statistics.
+  """
+  def __init__(self, dim, momentum=0.1, epsilon=1e-5, dtype=None):
+    super().__init__()
+    dtype = get_default_dtype() if dtype is None else dtype
+    self.momentum = momentum
+    self.epsilon = epsilon
+    self.trainable_parameters = [
+      Parameter(np.ones(shape=dim, dtype=dtype)),
+      Parameter(np.zeros(shape=dim, dtype=dtype))]
+    self.statistics = [
+      np.zeros(shape=dim, dtype=dtype), np.ones(shape=dim, dtype=dtype)]
+
+  def build(self, input_shape):
+    """Check the input shape and return it unchanged.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      (dim,)
+    """
+    gamma, _ = self.trainable_parameters
+    assert(tuple(input_shape) == gamma.value.shape)
+    return tuple(input_shape)
+
+  def forward(self, x):
+    """Forward propagation through BatchNorm1d.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer. Should have dimensions (batch, dim).
+
+    Returns
+    -------
+    np.array
+      Output of this layer.
+    """
+    gamma, beta = self.trainable_parameters
+    running_mean, running_var = self.statistics
+    if not is_grad_enabled():
+      scale = gamma.value / np.sqrt(running_var + self.epsilon)
+      shift = beta.value - running_mean * scale
+      out = self.output_buffer(x)
+      np.multiply(x, scale, out=out)
+      out += shift
+      return out
+
+    self.batch_statistics = self.training
+    if self.training:
+      n = x.shape[0]
+      mean = np.sum(x, axis=0, dtype=np.float64) / n
+      var = np.einsum("ij,ij->j", x, x, dtype=np.float64) / n
+      var -= mean * mean
+      np.maximum(var, 0, out=var)
+      running_mean *= 1 - self.momentum
+      running_mean += self.momentum * mean
+      running_var *= 1 - self.momentum
+      running_var += self.momentum * n / max(n - 1, 1) * var
+    else:
+      mean, var = running_mean, running_var
+    self.inv_std = (1 / np.sqrt(var + self.epsilon)).astype(x.dtype)
+    xhat = self.buffer("xhat", x.shape, x.dtype)
+    np.subtract(x, mean.astype(x.dtype, copy=False), out=xhat)
+    xhat *= self.inv_std
+    out = self.buffer("out", x.shape, x.dtype)
+    np.multiply(xhat, gamma.value, out=out)
+    out += beta.value
+    self.xhat = xhat
+    return out
+
+  def backward(self, grad):
+    """Backward propagation for BatchNorm1d.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+      Should have dimensions (batch, dim).
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer. Should have dimensions
+      (batch, dim).
+    """
+    gamma, beta = self.trainable_parameters
+    n = grad.shape[0]
+    dgamma = np.einsum("ij,ij->j", grad, self.xhat)
+    dbeta = np.sum(grad, axis=0)
+    dx = self.buffer("dx", grad.shape, grad.dtype)
+    k = gamma.value * self.inv_std
+    np.multiply(grad, k, out=dx)
+    if self.batch_statistics:
+      k /= n
+      dx -= k * dbeta
+      tmp = self.buffer("tmp", grad.shape, grad.dtype)
+      np.multiply(self.xhat, k * dgamma, out=tmp)
+      dx -= tmp
+    dgamma /= n
+    dbeta /= n
+    if is_grad_accumulating():
+      gamma.grad += dgamma
+      beta.grad += dbeta
+    else:
+      np.copyto(gamma.grad, dgamma, casting="same_kind")
+      np.copyto(beta.grad, dbeta, casting="same_kind")
+    return dx
+
+class LayerNorm(Module):
+  """Layer normalization over the features of each data point.
+
+  Parameters
+  ----------
+  dim : int
+    Number of features.
+  epsilon : float
+    A small constant added to the variance for numerical stability
+    (defaults to 1e-5).
+  dtype : np.dtype
+    Data type of the parameters (defaults to get_default_dtype()).
+
+  Notes:
+  ------
+  Statistics come from each data point alone, so training and evaluation
+  behave the same. The mean and variance of every row are taken in a
+  single pass of sums and sums of squares, accumulated in float64.
+  """
+  def __init__(self, dim, epsilon=1e-5, dtype=None):
+    super().__init__()
+    dtype = get_default_dtype() if dtype is None else dtype
+    self.epsilon = epsilon
+    self.trainable_parameters = [
+      Parameter(np.ones(shape=dim, dtype=dtype)),
+      Parameter(np.zeros(shape=dim, dtype=dtype))]
+
+  def build(self, input_shape):
+    """Check the input shape and return it unchanged.
+
+    Parameters
+    ----------
+    input_shape : tuple
+      Shape of one data point, without the batch dimension.
+
+    Returns
+    -------
+    tuple
+      (dim,)
+    """
+    gamma, _ = self.trainable_parameters
+    assert(tuple(input_shape) == gamma.value.shape)
+    return tuple(input_shape)
+
+  def forward(self, x):
+    """Forward propagation through LayerNorm.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer. Should have dimensions (batch, dim).
+
+    Returns
+    -------
+    np.array
+      Output of this layer.
+    """
+    gamma, beta = self.trainable_parameters
+    d = x.shape[1]
+    mean = np.sum(x, axis=1, dtype=np.float64) / d
+    var = np.einsum("ij,ij->i", x, x, dtype=np.float64) / d
+    var -= mean * mean
+    np.maximum(var, 0, out=var)
+    inv_std = (1 / np.sqrt(var + self.epsilon)).astype(x.dtype)[:, None]
+    grad_enabled = is_grad_enabled()
+    xhat = self.buffer("xhat", x.shape, x.dtype) if grad_enabled \
+      else self.output_buffer(x)
+    np.subtract(x, mean.astype(x.dtype)[:, None], out=xhat)
+    xhat *= inv_std
+    if not grad_enabled:
+      xhat *= gamma.value
+      xhat += beta.value
+      return xhat
+    out = self.buffer("out", x.shape, x.dtype)
+    np.multiply(xhat, gamma.value, out=out)
+    out += beta.value
+    self.xhat = xhat
+    self.inv_std = inv_std
+    return out
+
+  def backward(self, grad):
+    """Backward propagation for LayerNorm.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+      Should have dimensions (batch, dim).
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer. Should have dimensions
+      (batch, dim).
+    """
+    gamma, beta = self.trainable_parameters
+    n, d = grad.shape
+    dx = self.buffer("dx", grad.shape, grad.dtype)
+    np.multiply(grad, gamma.value, out=dx)
+    mean = np.sum(dx, axis=1, keepdims=True)
+    mean /= d
+    projection = np.einsum("ij,ij->i", dx, self.xhat)[:, None]
+    projection /= d
+    dx -= mean
+    tmp = self.buffer("tmp", grad.shape, grad.dtype)
+    np.multiply(self.xhat, projection, out=tmp)
+    dx -= tmp
+    dx *= self.inv_std
+    dgamma = np.einsum("ij,ij->j", grad, self.xhat)
+    dgamma /= n
+    dbeta = np.sum(grad, axis=0)
+    dbeta /= n
+    if is_grad_accumulating():
+      gamma.grad += dgamma
+      beta.grad += dbeta
+    else:
+      np.copyto(gamma.grad, dgamma, casting="same_kind")
+      np.copyto(beta.grad, dbeta, casting="same_kind")
+    return dx
+
+class Dropout(Module):
+  """Inverted dropout.
+
+  Parameters
+  ----------
+  p : float
+    Probability of zeroing each input (defaults to 0.5).
+
+  Notes:
+  ------
+  Training passes keep each input with probability 1 - p and scale the kept
+  ones by 1 / (1 - p); evaluation returns the input itself. The mask of a
+  whole batch is drawn from self.rng in one call as 16-bit integers and
+  kept as a boolean array, so p is resolved to a multiple of 1 / 65536.
+  """
+  levels = 1 << 16
+
+  def __init__(self, p=0.5):
+    super().__init__()
+    assert(0 <= p < 1)
+    self.p = p
+    self.threshold = int(round(p * self.levels))
+    self.scale = self.levels / (self.levels - self.threshold)
+    self.mask = None
+
+  def forward(self, x):
+    """Forward propagation through Dropout.
+
+    Parameters
+    ----------
+    x : np.array
+      Input for this layer.
+
+    Returns
+    -------
+    np.array
+      Output of this layer.
+    """
+    self.mask = None
+    if not self.is_training() or self.threshold == 0:
+      return x
+    draws = self.rng.integers(0, self.levels, size=x.shape, dtype=np.uint16)
+    mask = self.buffer("mask", x.shape, bool)
+    np.greater_equal(draws, self.threshold, out=mask)
+    out = self.buffer("out", x.shape, x.dtype)
+    np.multiply(x, mask, out=out)
+    out *= self.scale
+    self.mask = mask
+    return out
+
+  def backward(self, grad):
+    """Backward propagation for Dropout.
+
+    Parameters
+    ----------
+    grad : np.array
+      Gradient (Loss w.r.t. data) flowing backwards from the next layer.
+
+    Returns
+    -------
+    np.array
+      Gradients for the inputs to this layer.
+    """
+    if self.mask is None:
+      return grad
+    dx = self.buffer("dx", grad.shape, grad.dtype)
+    np.multiply(grad, self.mask, out=dx)
+    dx *= self.scale
+    return dx
+
 class SoftmaxCrossEntropy(Module):
   """Softmax Cross Entropy fused output activation."""
   def __init__(self):
@@ -211,22 +627,66 @@ class SoftmaxCrossEntropy(Module):
     -------
     np.array
       Predictions for this batch. Should have shape (batch, num_classes).
+
+    Notes:
+    ------
+    While gradients are tracked the logits and the log-sum-exp of each row
+    are kept as well, so losses can compute the loss from them instead of
+    from the probabilities.
     """
-    y_pred = softmax_cross_entropy(logits)
+    if not is_grad_enabled():
+      return softmax_cross_entropy(logits, out=self.output_buffer(logits))
+    self.lse = self.buffer("lse", (logits.shape[0], 1), logits.dtype)
+    y_pred = softmax_cross_entropy(
+      logits, out=self.output_buffer(logits), lse=self.lse)
+    self.logits = logits
     self.y_pred = y_pred
     return y_pred
 
+  def losses(self, labels):
+    """Cross entropy of every data point of the last forward pass.
+
+    Parameters
+    ----------
+    labels : np.array
+      One-hot encoded labels with shape (batch, num_classes), or integer
+      class indices with shape (batch,).
+
+    Returns
+    -------
+    np.array
+      Losses with shape (batch,).
+
+    Notes:
+    ------
+    Computed as the log-sum-exp kept by forward minus the logit of the true
+    class, which matches a log-softmax of the logits without evaluating
+    another exp over the whole batch.
+    """
+    lse = self.lse[:, 0]
+    if labels.ndim == 1:
+      return lse - self.logits[np.arange(labels.shape[0]), labels]
+    return lse * np.sum(labels, axis=1) \
+      - np.einsum("ij,ij->i", labels, self.logits)
+
   def backward(self, labels):
     """Backward propagation of the Softmax activation.
 
     Parameters
     ----------
     labels : np.array
-      One-hot encoded labels. Should have shape (batch, num_classes).
+      One-hot encoded labels with shape (batch, num_classes), or integer
+      class indices with shape (batch,).
 
     Returns
     -------
     np.array
       Initial backprop gradients.
     """
-    return self.y_pred - labels
+    grad = self.buffer("grad", self.y_pred.shape, self.y_pred.dtype)
+    if labels.ndim == 1:
+      np.copyto(grad, self.y_pred)
+      grad[np.arange(grad.shape[0]), labels] -= 1
+    else:
+      np.subtract(self.y_pred, labels, out=grad)
+    return grad
@@ -3,17 +3,21 @@
 import numpy as np
 
 from .base import BiasInitializer
+from ...base import get_default_dtype
 
 class Zero(BiasInitializer):
-  def __init__(self, out_dim):
+  def __init__(self, out_dim, dtype=None):
     """Zero initialization.
 
     Parameters
     ----------
     out_dim : int
       Length of output dimensions.
+    dtype : np.dtype
+      Data type of the bias (defaults to get_default_dtype()).
     """
     self.out_dim = out_dim
+    self.dtype = get_default_dtype() if dtype is None else dtype
 
   def initialize_params(self):
     """Apply zero initialization.
@@ -23,4 +27,4 @@ class Zero(BiasInitializer):
     np.array
       Initialized bias.
     """
-    return np.zeros(shape=(self.out_dim))
+    return np.zeros(shape=(self.out_dim), dtype=self.dtype)
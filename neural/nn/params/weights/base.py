@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+import numpy as np
+
 class WeightInitializer:
   """Base class for weight initialization."""
   def initialize_params(self):
@@ -11,3 +13,24 @@ class WeightInitializer:
       Initialized weight matrix.
     """
     raise NotImplementedError()
+
+  def uniform(self, bound):
+    """Draw an (out_dim, in_dim) matrix uniformly from [-bound, bound).
+
+    Parameters
+    ----------
+    bound : float
+      Largest magnitude of a weight.
+
+    Returns
+    -------
+    np.array
+      Weight matrix of self.dtype, drawn from self.rng. Single and double
+      precision are drawn directly in that dtype, without a cast.
+    """
+    dtype = np.dtype(self.dtype)
+    draw = dtype if dtype in (np.float32, np.float64) else np.float64
+    W = self.rng.random(size=(self.out_dim, self.in_dim), dtype=draw)
+    W *= 2 * bound
+    W -= bound
+    return W.astype(dtype, copy=False)
@@ -3,6 +3,7 @@
 import numpy as np
 
 from .base import WeightInitializer
+from ...base import get_default_dtype
 
 class Xavier(WeightInitializer):
   """Uniform Xavier initialization.
@@ -13,10 +14,16 @@ class Xavier(WeightInitializer):
     Length of input dimensions.
   out_dim : int
     Length of output dimensions.
+  dtype : np.dtype
+    Data type of the weights (defaults to get_default_dtype()).
+  rng : np.random.Generator
+    Random number generator to draw from (defaults to a new unseeded one).
   """
-  def __init__(self, in_dim, out_dim):
+  def __init__(self, in_dim, out_dim, dtype=None, rng=None):
     self.in_dim = in_dim
     self.out_dim = out_dim
+    self.dtype = get_default_dtype() if dtype is None else dtype
+    self.rng = np.random.default_rng() if rng is None else rng
 
   def initialize_params(self):
     """Apply Uniform Xavier initialization.
@@ -26,8 +33,7 @@ class Xavier(WeightInitializer):
     np.array.
       Initialized weight matrix.
     """
-    u = np.sqrt(6 / float(self.in_dim + self.out_dim))
-    return np.random.uniform(low=-u, high=u, size=(self.out_dim, self.in_dim))
+    return self.uniform(np.sqrt(6 / float(self.in_dim + self.out_dim)))
 
 class He(WeightInitializer):
   """Uniform He initialization.
@@ -38,10 +44,16 @@ class He(WeightInitializer):
     Length of input dimensions.
   out_dim : int
     Length of output dimensions.
+  dtype : np.dtype
+    Data type of the weights (defaults to get_default_dtype()).
+  rng : np.random.Generator
+    Random number generator to draw from (defaults to a new unseeded one).
   """
-  def __init__(self, in_dim, out_dim):
+  def __init__(self, in_dim, out_dim, dtype=None, rng=None):
     self.in_dim = in_dim
     self.out_dim = out_dim
+    self.dtype = get_default_dtype() if dtype is None else dtype
+    self.rng = np.random.default_rng() if rng is None else rng
 
   def initialize_params(self):
     """Apply Uniform He initialization.
@@ -51,5 +63,4 @@ class He(WeightInitializer):
     np.array.
       Initialized weight matrix.
     """
-    u = np.sqrt(6 / float(self.in_dim))
-    return np.random.uniform(low=-u, high=u, size=(self.out_dim, self.in_dim))
+    return self.uniform(np.sqrt(6 / float(self.in_dim)))
@@ -1,14 +1,56 @@
 #!/usr/bin/env python
 
+from ...nn.base import ParameterArena
+
 class Optimizer:
-  """Base class for optimization policy."""
-  def initialize_params(self, params):
+  """Base class for optimization policy.
+
+  Attributes
+  ----------
+  arena : ParameterArena
+    Flat storage for the parameters registered through initialize_params, or
+    None before registration.
+  slots : str[]
+    Names of the flat per-parameter state arrays kept alongside the arena,
+    e.g. Adam's moments. Checkpoints save and restore them.
+  """
+  arena = None
+  slots = ()
+
+  def initialize_params(self, params, master_dtype=None):
     """Initialize optimizer state.
 
     Parameters
     ----------
     params : Parameter[]
-      List of parameters to initialize state for.
+      List of parameters to initialize state for. They are packed into a
+      single ParameterArena so that updates can run over one flat array.
+    master_dtype : np.dtype
+      Data type of the weights and state the optimizer updates (defaults to
+      the dtype of the parameters). A wider dtype than the parameters keeps
+      master weights that are copied back after every step.
+    """
+    self.arena = ParameterArena(params, master_dtype=master_dtype)
+
+  def is_fused(self, params):
+    """Check whether params can be updated through the flat arena.
+
+    Parameters
+    ----------
+    params : Parameter[]
+      List of parameters passed to apply_gradients.
+
+    Returns
+    -------
+    bool
+      True if params is the list registered through initialize_params.
+    """
+    return self.arena is not None and params is self.arena.params
+
+  def flush(self):
+    """Bring any lazily deferred state up to date.
+
+    Called before the state is saved; does nothing by default.
     """
 
   def get_lr(self):
@@ -3,6 +3,7 @@
 import numpy as np
 
 from .base import Optimizer
+from ..sparse import take_columns, put_columns
 
 class SGD(Optimizer):
   """Stochastic Gradient Descent (SGD) optimizer.
@@ -15,12 +16,31 @@ class SGD(Optimizer):
   def __init__(self, lr=0.01):
     self.lr = lr
 
-  def initialize_params(self, params):
+  def initialize_params(self, params, master_dtype=None):
     """Initialize optimizer state.
 
     params : np.array[]
       List of parameters that will be used with this optimizer.
+    master_dtype : np.dtype
+      Data type of the master weights (defaults to the parameter dtype).
     """
+    super().initialize_params(params, master_dtype=master_dtype)
+    self.scratch = self.arena.zeros()
+
+  def step(self, value, grad, scratch):
+    """Apply one in place update.
+
+    Parameters
+    ----------
+    value : np.array
+      Parameter values to update.
+    grad : np.array
+      Gradients of value.
+    scratch : np.array
+      Temporary array shaped like value.
+    """
+    np.multiply(grad, self.lr, out=scratch)
+    value -= scratch
 
   def apply_gradients(self, params):
     """Apply gradients to parameters.
@@ -30,8 +50,15 @@ class SGD(Optimizer):
     params : Parameter[]
       List of parameters that the gradients correspond to.
     """
+    if self.is_fused(params):
+      self.step(self.arena.master, self.arena.grad, self.scratch)
+      self.arena.sync()
+      return
     for p in params:
-      p.value -= self.lr * p.grad
+      master = getattr(p, "master", p.value)
+      self.step(master, p.grad, np.empty_like(master))
+      if master is not p.value:
+        np.copyto(p.value, master, casting="same_kind")
 
 class Adam(Optimizer):
   """Adam (Adaptive Moment) optimizer.
@@ -47,22 +74,151 @@ class Adam(Optimizer):
   epsilon : float
     A small constant added to the denominator for numerical stability
     (defaults to 1e-7).
+  lazy : bool
+    Update only the columns of a parameter whose gradient may be nonzero, as
+    recorded in Parameter.touched by Dense layers fed sparse input (defaults
+    to False).
+
+  Notes:
+  ------
+  In lazy mode every parameter keeps a counter per last-axis column with
+  the step it was last updated at. When a column is touched again its
+  moments are first decayed by beta ** skipped for the steps it missed, so
+  they match what the dense update would hold. The weights of skipped
+  columns are not moved by their decaying momentum in the meantime, which
+  is the usual lazy Adam approximation. Step cost then follows the number
+  of touched columns rather than the parameter count.
   """
-  def __init__(self, lr=0.001, beta1=0.9, beta2=0.999, epsilon=1e-7):
+  slots = ("m", "v")
+
+  def __init__(
+      self, lr=0.001, beta1=0.9, beta2=0.999, epsilon=1e-7, lazy=False):
     self.lr = lr
     self.beta1 = beta1
     self.beta2 = beta2
     self.epsilon = epsilon
+    self.lazy = lazy
 
-  def initialize_params(self, params):
+  def initialize_params(self, params, master_dtype=None):
     """Initialize optimizer state.
 
     params : np.array[]
       List of parameters that will be used with this optimizer.
+    master_dtype : np.dtype
+      Data type of the master weights (defaults to the parameter dtype).
     """
-    for p in params:
-      p.m = np.zeros_like(p.value)
-      p.v = np.zeros_like(p.value)
+    super().initialize_params(params, master_dtype=master_dtype)
+    self.m = self.arena.zeros()
+    self.v = self.arena.zeros()
+    self.scratch = (self.arena.zeros(), self.arena.zeros())
+    for p, m, v in zip(
+        params, self.arena.views(self.m), self.arena.views(self.v)):
+      p.m = m
+      p.v = v
+    self.t = 0
+    if self.lazy:
+      for p, tmp, update in zip(
+          params, *(self.arena.views(a) for a in self.scratch)):
+        p.last = np.zeros(shape=p.value.shape[-1:], dtype=np.int64)
+        p.scratch = (tmp, update)
+
+  def step(self, value, grad, m, v, scratch):
+    """Apply one in place update.
+
+    Parameters
+    ----------
+    value : np.array
+      Parameter values to update.
+    grad : np.array
+      Gradients of value.
+    m : np.array
+      First moment estimate of value.
+    v : np.array
+      Second moment estimate of value.
+    scratch : (np.array, np.array)
+      Two temporary arrays shaped like value.
+    """
+    tmp, update = scratch
+    m *= self.beta1
+    np.multiply(grad, 1 - self.beta1, out=tmp)
+    m += tmp
+    v *= self.beta2
+    np.square(grad, out=tmp)
+    tmp *= 1 - self.beta2
+    v += tmp
+    np.divide(v, 1 - self.beta2, out=tmp)
+    np.sqrt(tmp, out=tmp)
+    tmp += self.epsilon
+    np.divide(m, 1 - self.beta1, out=update)
+    update /= tmp
+    update *= self.lr
+    value -= update
+
+  def catch_up(self, p, columns=None):
+    """Decay the moments of columns for the steps they were skipped.
+
+    Parameters
+    ----------
+    p : Parameter
+      Parameter updated in lazy mode.
+    columns : np.array
+      Columns to bring up to date (defaults to all of them).
+
+    Returns
+    -------
+    (np.array, np.array) or None
+      The moments of columns, gathered into new arrays, or None when
+      columns is None and p.m, p.v were updated in place.
+    """
+    last = p.last if columns is None else p.last[columns]
+    skipped = self.t - 1 - last
+    if columns is None:
+      if skipped.any():
+        p.m *= self.beta1 ** skipped
+        p.v *= self.beta2 ** skipped
+      return None
+    m = take_columns(p.m, columns)
+    m *= self.beta1 ** skipped
+    v = take_columns(p.v, columns)
+    v *= self.beta2 ** skipped
+    return m, v
+
+  def lazy_step(self, p):
+    """Apply one lazy update to p; see the class notes."""
+    master = getattr(p, "master", p.value)
+    if p.touched is None:
+      self.catch_up(p)
+      self.step(master, p.grad, p.m, p.v, p.scratch)
+      p.last.fill(self.t)
+      if master is not p.value:
+        np.copyto(p.value, master, casting="same_kind")
+      return
+    columns = p.touched
+    m, v = self.catch_up(p, columns)
+    value = take_columns(master, columns)
+    self.step(
+      value, take_columns(p.grad, columns), m, v,
+      (np.empty_like(value), np.empty_like(value)))
+    put_columns(p.m, columns, m)
+    put_columns(p.v, columns, v)
+    put_columns(master, columns, value)
+    if master is not p.value:
+      put_columns(p.value, columns, value)
+    p.last[columns] = self.t
+
+  def flush(self):
+    """Bring the moments of every skipped column up to date.
+
+    Restarts the step counters, so the m and v slots alone describe the
+    optimizer state, e.g. when it is checkpointed.
+    """
+    if not self.lazy or self.arena is None:
+      return
+    self.t += 1
+    for p in self.arena.params:
+      self.catch_up(p)
+      p.last.fill(0)
+    self.t = 0
 
   def apply_gradients(self, params):
     """Apply gradients to parameters.
@@ -72,12 +228,22 @@ class Adam(Optimizer):
     params : Variable[]
         List of parameters that the gradients correspond to.
     """
+    if self.lazy:
+      self.t += 1
+      for p in params:
+        self.lazy_step(p)
+      return
+    if self.is_fused(params):
+      self.step(
+        self.arena.master, self.arena.grad, self.m, self.v, self.scratch)
+      self.arena.sync()
+      return
     for p in params:
-      p.m = p.m * self.beta1 + p.grad * (1 - self.beta1)
-      p.v = p.v * self.beta2 + np.square(p.grad) * (1 - self.beta2)
-      update = (
-          (p.m / (1 - self.beta1))
-          / (np.sqrt(p.v / (1 - self.beta2)) + self.epsilon))
-      p.value -= self.lr * update
+      master = getattr(p, "master", p.value)
+      self.step(
+        master, p.grad, p.m, p.v,
+        (np.empty_like(master), np.empty_like(master)))
+      if master is not p.value:
+        np.copyto(p.value, master, casting="same_kind")
 
 supported_optimizers = [SGD, Adam]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+
+import mmap
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from .metrics import Loss, Accuracy
+from .callbacks import ProgressBar
+from .utils.data.memmap import take
+
+def shared_array(shape, dtype):
+  """Allocate a zeroed array in anonymous shared memory.
+
+  Parameters
+  ----------
+  shape : tuple
+    Shape of the array.
+  dtype : np.dtype
+    Data type of the array.
+
+  Returns
+  -------
+  np.array
+    Array whose memory is shared with processes forked afterwards.
+  """
+  dtype = np.dtype(dtype)
+  count = int(np.prod(shape))
+  buf = mmap.mmap(-1, max(count * dtype.itemsize, 1))
+  return np.frombuffer(buf, dtype=dtype, count=count).reshape(shape)
+
+class DataParallel:
+  """Data-parallel trainer that shards every batch across worker processes.
+
+  Parameters
+  ----------
+  model : Sequential
+    Model to train. Its parameter values and gradients are moved into
+    shared memory, so models with lazy modules must be built first.
+  workers : int
+    Number of worker processes (defaults to 2).
+
+  Notes:
+  ------
+  Workers are forked at the start of every epoch, so each holds a replica
+  of the modules and the dataset without pickling. Each worker runs the
+  forward and backward pass on its shard of the batch into a private
+  gradient arena in shared memory. The workers then all-reduce those
+  gradients, each summing a contiguous segment of the flat arena in fixed
+  worker order, before the optimizer steps once in the parent. For a fixed
+  seed and worker count the results are bit-for-bit reproducible. Every
+  worker gives its modules fresh streams spawned from the model's root
+  seed, so dropout masks differ across workers and epochs. Module
+  statistics live in shared memory and only the first worker updates
+  them, from its shard. Requires the fork start method. Limit BLAS threads
+  per process (e.g. OMP_NUM_THREADS=1) to avoid oversubscription.
+  """
+  def __init__(self, model, workers=2):
+    assert(workers > 0)
+    assert(model.built)
+    self.model = model
+    self.workers = workers
+
+    arena = model.optimizer.arena
+    arena.rebind(value=shared_array(arena.value.shape, arena.value.dtype))
+    arena.rebind(grad=shared_array(arena.grad.shape, arena.grad.dtype))
+    for module in model.modules:
+      statistics = []
+      for a in module.statistics:
+        shared = shared_array(a.shape, a.dtype)
+        np.copyto(shared, a)
+        statistics.append(shared)
+      module.statistics = statistics
+    self.grads = shared_array((workers, arena.size), arena.grad.dtype)
+    self.segments = np.linspace(0, arena.size, workers + 1).astype(int)
+
+  def train(self, dataset, metrics=None, callbacks=None, report_every=50):
+    """Fit model on dataset for a single epoch.
+
+    Parameters
+    ----------
+    dataset : Dataset
+      Training dataset with batches already split.
+    metrics : Metric[]
+      Metrics tracked in addition to the loss and accuracy, as in
+      Sequential.train (defaults to none).
+    callbacks : Callback[]
+      Sinks the running metrics are reported to, as in Sequential.train
+      (defaults to a single ProgressBar).
+    report_every : int
+      Number of batches between reports (defaults to 50).
+
+    Returns
+    -------
+    (float, float)
+      [0] Mean train loss during this epoch.
+      [1] Mean train accuracy during this epoch.
+
+    Notes:
+    ------
+    Workers send back the logits and log-sum-exps of their shards. The
+    parent loads those of the whole batch into its loss module and updates
+    the metrics from it, so results match Sequential.train.
+    """
+    assert(dataset.batch >= self.workers)
+    assert(report_every > 0)
+    model = self.model
+    model.set_training(True)
+    seeds = model.seed_sequence.spawn(self.workers)
+    context = multiprocessing.get_context("fork")
+    pipes, processes = [], []
+    for rank in range(self.workers):
+      parent, child = context.Pipe()
+      process = context.Process(
+        target=self.work, args=(rank, child, dataset, seeds[rank]),
+        daemon=True)
+      process.start()
+      child.close()
+      pipes.append(parent)
+      processes.append(process)
+
+    metrics = [Loss(), Accuracy()] + list(metrics or [])
+    for metric in metrics:
+      metric.reset()
+    callbacks = [ProgressBar()] if callbacks is None else callbacks
+    for callback in callbacks:
+      callback.on_epoch_begin(dataset.size)
+    try:
+      for i, batch in enumerate(dataset.shuffle()):
+        shards = np.array_split(batch, self.workers)
+        weights = [len(shard) / len(batch) for shard in shards]
+        outputs = self.call(pipes, [("step", shard) for shard in shards])
+        self.call(pipes, [("reduce", weights)] * self.workers)
+        model.optimizer.apply_gradients(model.params)
+
+        model.loss.logits = np.concatenate([o[0] for o in outputs])
+        model.loss.lse = np.concatenate([o[1] for o in outputs])
+        labels = take(dataset.y, batch)
+        for metric in metrics:
+          metric.update_from_loss(model.loss, labels)
+        if callbacks and (i + 1) % report_every == 0:
+          logs = {metric.name: metric.result() for metric in metrics}
+          for callback in callbacks:
+            callback.on_report(i + 1, logs)
+    finally:
+      for pipe in pipes:
+        pipe.send(("close", None))
+      for process in processes:
+        process.join()
+    model.lr_scheduler.step()
+
+    logs = {metric.name: metric.result() for metric in metrics}
+    for callback in callbacks:
+      callback.on_epoch_end(logs)
+    return logs["loss"], logs["accuracy"]
+
+  def call(self, pipes, messages):
+    """Send one message to every worker and wait for all replies.
+
+    Parameters
+    ----------
+    pipes : Connection[]
+      Parent ends of the worker pipes.
+    messages : tuple[]
+      One (command, argument) pair per worker.
+
+    Returns
+    -------
+    list
+      One reply per worker.
+    """
+    for pipe, message in zip(pipes, messages):
+      pipe.send(message)
+    replies = [pipe.recv() for pipe in pipes]
+    for reply in replies:
+      if isinstance(reply, str):
+        raise RuntimeError("DataParallel worker failed:\n" + reply)
+    return replies
+
+  def work(self, rank, pipe, dataset, seed):
+    """Worker loop; runs in a forked process.
+
+    Parameters
+    ----------
+    rank : int
+      Index of this worker.
+    pipe : Connection
+      Child end of the pipe to the parent.
+    dataset : Dataset
+      Training dataset, inherited from the parent.
+    seed : np.random.SeedSequence
+      Seed of this worker for the epoch; every plan module gets a stream
+      spawned from it.
+    """
+    model = self.model
+    arena = model.optimizer.arena
+    for p, grad in zip(arena.params, arena.views(self.grads[rank])):
+      p.grad = grad
+    for module, stream in zip(model.plan, seed.spawn(len(model.plan))):
+      module.rng = np.random.default_rng(stream)
+      if rank > 0:
+        module.statistics = [a.copy() for a in module.statistics]
+    start, stop = self.segments[rank], self.segments[rank + 1]
+    while True:
+      command, argument = pipe.recv()
+      if command == "close":
+        return
+      try:
+        if command == "step":
+          X, y = dataset.gather(argument)
+          model.forward(X)
+          outputs = (model.loss.logits.copy(), model.loss.lse.copy())
+          model.backward(y)
+          pipe.send(outputs)
+        elif command == "reduce":
+          reduced = arena.grad[start:stop]
+          np.multiply(self.grads[0, start:stop], argument[0], out=reduced)
+          for k in range(1, self.workers):
+            reduced += self.grads[k, start:stop] * argument[k]
+          pipe.send(None)
+      except BaseException:
+        pipe.send(traceback.format_exc())
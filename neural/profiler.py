@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+def shape_of(x):
+  """Shape of an array, sparse matrix or array-like."""
+  return tuple(x.shape) if hasattr(x, "shape") else np.shape(x)
+
+class Profiler:
+  """Per-module timing and allocation recorder for a Sequential model.
+
+  Parameters
+  ----------
+  model : Sequential
+    Model whose modules, loss, optimizer and learning rate scheduler are
+    given readable names in the report.
+  trace_memory : bool
+    Record the bytes allocated during every event with tracemalloc
+    (defaults to False). This slows down every allocation while enabled.
+
+  Attributes
+  ----------
+  events : dict[]
+    Recorded events in order. Each has a name, a category (forward,
+    backward, apply_gradients, step or fetch), start and duration in
+    seconds, the output shape and the bytes allocated (None unless
+    trace_memory is set).
+
+  Notes:
+  ------
+  Use through Sequential.profile, which attaches the profiler for the
+  duration of a with block. Outside of it the model runs uninstrumented.
+  """
+  def __init__(self, model, trace_memory=False):
+    self.trace_memory = trace_memory
+    self.events = []
+    self.names = {id(module): "%d:%s" % (i, type(module).__name__)
+      for i, module in enumerate(model.plan)}
+    for role in ["loss", "optimizer", "lr_scheduler"]:
+      obj = getattr(model, role)
+      self.names[id(obj)] = "%s:%s" % (role, type(obj).__name__)
+    self.origin = time.perf_counter()
+
+  def start(self):
+    """Begin recording."""
+    if self.trace_memory:
+      tracemalloc.start()
+
+  def stop(self):
+    """End recording."""
+    if self.trace_memory:
+      tracemalloc.stop()
+
+  def run(self, obj, method, *args):
+    """Call obj.method(*args) and record it as an event.
+
+    Parameters
+    ----------
+    obj : object
+      Module, loss, optimizer or scheduler.
+    method : str
+      Name of the method to call; also the event category.
+    *args
+      Arguments of the call.
+
+    Returns
+    -------
+    object
+      The return value of the call.
+    """
+    before = self.memory()
+    start = time.perf_counter()
+    out = getattr(obj, method)(*args)
+    self.record(
+      self.names.get(id(obj), type(obj).__name__), method, start,
+      None if out is None else shape_of(out), before)
+    return out
+
+  def iterate(self, dataset):
+    """Iterate over dataset, recording every batch fetch as an event.
+
+    Parameters
+    ----------
+    dataset : Dataset
+      Dataset or DataLoader to draw batches from.
+
+    Returns
+    -------
+    generator
+      Yields the batches of the dataset.
+    """
+    name = "data:%s" % type(dataset).__name__
+    batches = iter(dataset)
+    while True:
+      before = self.memory()
+      start = time.perf_counter()
+      try:
+        batch = next(batches)
+      except StopIteration:
+        return
+      self.record(name, "fetch", start, shape_of(batch[0]), before)
+      yield batch
+
+  def memory(self):
+    """Reset the tracemalloc peak and return the traced bytes, if tracing."""
+    if not self.trace_memory:
+      return None
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+  def record(self, name, category, start, shape, before):
+    """Append an event that started at start and ends now."""
+    duration = time.perf_counter() - start
+    allocated = None
+    if before is not None:
+      allocated = tracemalloc.get_traced_memory()[1] - before
+    self.events.append({
+      "name": name,
+      "category": category,
+      "start": start - self.origin,
+      "duration": duration,
+      "shape": shape,
+      "bytes": allocated,
+      "thread": threading.get_ident(),
+    })
+
+  def table(self):
+    """Summarize events per name and category.
+
+    Returns
+    -------
+    str
+      One row per (name, category) sorted by total time, with call count,
+      total and mean milliseconds, share of recorded time, mean bytes
+      allocated and the last output shape.
+    """
+    rows = {}
+    for event in self.events:
+      key = (event["name"], event["category"])
+      row = rows.setdefault(key, [0, 0.0, 0, None])
+      row[0] += 1
+      row[1] += event["duration"]
+      row[2] += event["bytes"] or 0
+      row[3] = event["shape"]
+    total = sum(row[1] for row in rows.values()) or 1.0
+
+    lines = ["%-28s %-16s %7s %10s %9s %7s %12s  %s" % (
+      "name", "category", "calls", "total ms", "mean ms", "%", "mean KiB",
+      "shape")]
+    for (name, category), (calls, seconds, allocated, shape) in sorted(
+        rows.items(), key=lambda item: -item[1][1]):
+      lines.append("%-28s %-16s %7d %10.2f %9.3f %7.1f %12s  %s" % (
+        name, category, calls, seconds * 1e3, seconds * 1e3 / calls,
+        100 * seconds / total,
+        "%.1f" % (allocated / calls / 2 ** 10) if self.trace_memory else "-",
+        shape))
+    return "\n".join(lines)
+
+  def chrome_trace(self):
+    """Convert the events to the Chrome trace event format.
+
+    Returns
+    -------
+    dict
+      Trace that chrome://tracing and Perfetto can load.
+    """
+    return {"traceEvents": [{
+      "name": event["name"],
+      "cat": event["category"],
+      "ph": "X",
+      "ts": event["start"] * 1e6,
+      "dur": event["duration"] * 1e6,
+      "pid": 0,
+      "tid": event["thread"],
+      "args": {"shape": event["shape"], "bytes": event["bytes"]},
+    } for event in self.events]}
+
+  def export_chrome_trace(self, path):
+    """Write the events as a Chrome trace JSON file.
+
+    Parameters
+    ----------
+    path : str
+      Destination file.
+    """
+    with open(path, "w") as f:
+      json.dump(self.chrome_trace(), f)
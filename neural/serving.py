@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+
+import asyncio
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+class InferenceEngine:
+  """Thread-safe inference server that batches concurrent requests.
+
+  Parameters
+  ----------
+  model : Sequential
+    Trained model. Only its predict method is used.
+  max_batch : int
+    Largest number of requests evaluated in one forward pass (defaults to
+    64).
+  max_latency : float
+    Seconds a request may wait for others to join its batch (defaults to
+    0.002).
+  workers : int
+    Number of threads running forward passes (defaults to 1).
+  logits : bool
+    Return logits instead of probabilities (defaults to False).
+  window : int
+    Number of most recent requests kept for latency percentiles (defaults
+    to 10000).
+
+  Notes:
+  ------
+  Requests are single data points without a batch dimension. A worker takes
+  the oldest request, collects more until max_batch is reached or the
+  oldest has waited max_latency, stacks them and runs one predict. predict
+  runs under no_grad, so modules keep no references to activations and
+  several workers can evaluate at once; do not train the model while the
+  engine is running.
+  """
+  def __init__(
+      self, model, max_batch=64, max_latency=0.002, workers=1, logits=False,
+      window=10000):
+    assert(max_batch > 0)
+    assert(max_latency >= 0)
+    assert(workers > 0)
+    self.model = model
+    self.max_batch = max_batch
+    self.max_latency = max_latency
+    self.logits = logits
+
+    self.requests = queue.Queue()
+    self.lock = threading.Lock()
+    self.closed = False
+    self.latencies = collections.deque(maxlen=window)
+    self.completed = 0
+    self.batches = 0
+    self.started = time.perf_counter()
+
+    self.threads = [
+      threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+    for thread in self.threads:
+      thread.start()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def submit(self, x):
+    """Queue one data point for prediction; raises RuntimeError once the
+    engine has been closed.
+
+    Parameters
+    ----------
+    x : np.array
+      Input data point, without a batch dimension.
+
+    Returns
+    -------
+    Future
+      Resolves to the prediction for x.
+    """
+    future = Future()
+    with self.lock:
+      if self.closed:
+        raise RuntimeError("InferenceEngine is closed")
+      self.requests.put((np.asarray(x), future, time.perf_counter()))
+    return future
+
+  def predict(self, x, timeout=None):
+    """Predict one data point, blocking until it has been evaluated.
+
+    Parameters
+    ----------
+    x : np.array
+      Input data point, without a batch dimension.
+    timeout : float
+      Seconds to wait for the result (defaults to no limit).
+
+    Returns
+    -------
+    np.array
+      Prediction for x.
+    """
+    return self.submit(x).result(timeout)
+
+  async def predict_async(self, x):
+    """Predict one data point from a coroutine.
+
+    Parameters
+    ----------
+    x : np.array
+      Input data point, without a batch dimension.
+
+    Returns
+    -------
+    np.array
+      Prediction for x.
+    """
+    return await asyncio.wrap_future(self.submit(x))
+
+  def collect(self):
+    """Block for the next batch of requests, or None once closed."""
+    first = self.requests.get()
+    if first is None:
+      self.requests.put(None)
+      return None
+    batch = [first]
+    deadline = first[2] + self.max_latency
+    while len(batch) < self.max_batch:
+      try:
+        wait = deadline - time.perf_counter()
+        request = self.requests.get(timeout=wait) if wait > 0 \
+          else self.requests.get_nowait()
+      except queue.Empty:
+        break
+      if request is None:
+        self.requests.put(None)
+        break
+      batch.append(request)
+    return batch
+
+  def work(self):
+    """Worker thread loop: evaluate batches until closed."""
+    while True:
+      batch = self.collect()
+      if batch is None:
+        return
+      batch = [request for request in batch
+        if request[1].set_running_or_notify_cancel()]
+      if not batch:
+        continue
+      try:
+        pred = self.model.predict(
+          np.stack([x for x, _, _ in batch]), logits=self.logits)
+        for (_, future, _), y in zip(batch, pred):
+          future.set_result(y)
+      except Exception:
+        self.evaluate_each(batch)
+
+      done = time.perf_counter()
+      with self.lock:
+        self.latencies.extend(done - start for _, _, start in batch)
+        self.completed += len(batch)
+        self.batches += 1
+
+  def evaluate_each(self, batch):
+    """Evaluate requests one at a time so that a bad input only fails its
+    own request."""
+    for x, future, _ in batch:
+      try:
+        future.set_result(self.model.predict(x[None], logits=self.logits)[0])
+      except Exception as e:
+        future.set_exception(e)
+
+  def metrics(self):
+    """Summarize the requests served so far.
+
+    Returns
+    -------
+    dict
+      p50 and p99 latency in seconds over the recent window, throughput in
+      requests per second since the engine started, the number of completed
+      requests and the mean batch size.
+    """
+    with self.lock:
+      latencies = np.array(self.latencies)
+      completed, batches = self.completed, self.batches
+    elapsed = time.perf_counter() - self.started
+    p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size \
+      else (np.nan, np.nan)
+    return {
+      "p50": float(p50),
+      "p99": float(p99),
+      "throughput": completed / elapsed,
+      "completed": completed,
+      "mean_batch": completed / batches if batches else 0.0,
+    }
+
+  def close(self):
+    """Finish the queued requests and stop the worker threads.
+
+    Submitting after close raises RuntimeError. Requests still queued once
+    the workers have stopped fail with RuntimeError rather than waiting
+    forever. Closing twice has no effect.
+    """
+    with self.lock:
+      if self.closed:
+        return
+      self.closed = True
+      self.requests.put(None)
+    for thread in self.threads:
+      thread.join()
+    while True:
+      try:
+        request = self.requests.get_nowait()
+      except queue.Empty:
+        return
+      if request is not None and request[1].set_running_or_notify_cancel():
+        request[1].set_exception(RuntimeError("InferenceEngine is closed"))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import copy
+
+import numpy as np
+
+class WeightSnapshot:
+  """Flat copy of a model's weights with a shadow model that reads it.
+
+  Parameters
+  ----------
+  model : Sequential
+    Model to snapshot.
+
+  Attributes
+  ----------
+  value : np.array
+    Flat copy of every parameter value of the model's execution plan.
+  statistics : np.array
+    Flat copy of every module statistic of the plan, e.g. running means.
+  model : Sequential
+    Shallow copy of the model whose plan modules are shallow copies bound to
+    views of value. It shares everything else, including the loss module,
+    so it must only be used for inference (predict and test), which keeps no
+    state in the modules and is safe to run on another thread while the
+    original model trains.
+  """
+  def __init__(self, model):
+    self.source = [p for module in model.plan
+      for p in module.trainable_parameters]
+    self.value = np.empty(
+      shape=sum(p.value.size for p in self.source), dtype=model.dtype)
+    self.source_statistics = [a for module in model.plan
+      for a in module.statistics]
+    self.statistics = np.empty(
+      shape=sum(a.size for a in self.source_statistics), dtype=model.dtype)
+    self.params = []
+    self.shadow_statistics = []
+    self.model = copy.copy(model)
+    self.model.plan = []
+    offset = 0
+    position = 0
+    for module in model.plan:
+      shadow = copy.copy(module)
+      shadow.statistics = []
+      for a in module.statistics:
+        view = self.statistics[position:position + a.size].reshape(a.shape)
+        position += a.size
+        shadow.statistics.append(view)
+        self.shadow_statistics.append(view)
+      shadow.trainable_parameters = []
+      for p in module.trainable_parameters:
+        q = copy.copy(p)
+        q.value = self.value[offset:offset + p.value.size].reshape(
+          p.value.shape)
+        offset += p.value.size
+        shadow.trainable_parameters.append(q)
+        self.params.append(q)
+      self.model.plan.append(shadow)
+
+  def capture(self):
+    """Copy the current weights and statistics into the snapshot."""
+    if self.source:
+      np.concatenate([p.value.ravel() for p in self.source], out=self.value)
+    if self.source_statistics:
+      np.concatenate(
+        [a.ravel() for a in self.source_statistics], out=self.statistics)
+
+  def restore(self):
+    """Copy the snapshot back into the weights and statistics of the model.
+
+    Notes:
+    ------
+    Master weights kept by the optimizer under mixed precision are reset to
+    the snapshot as well, at the precision of the compute dtype.
+    """
+    for p, q in zip(self.source, self.params):
+      np.copyto(p.value, q.value)
+      master = getattr(p, "master", None)
+      if master is not None and not np.may_share_memory(master, p.value):
+        np.copyto(master, q.value)
+    for a, view in zip(self.source_statistics, self.shadow_statistics):
+      np.copyto(a, view)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+class CSRMatrix:
+  """Compressed sparse row matrix.
+
+  Parameters
+  ----------
+  data : np.array
+    Stored values, row by row.
+  indices : np.array
+    Column of each stored value.
+  indptr : np.array
+    Row boundaries: the values of row i are data[indptr[i]:indptr[i + 1]].
+  shape : (int, int)
+    Number of rows and columns.
+
+  Notes:
+  ------
+  A minimal replacement for scipy.sparse.csr_matrix covering what the
+  library needs: row slicing and gathering for batching, and the two
+  products of a Dense layer. Products iterate over the stored values, so
+  their time and memory follow nnz rather than the full input width or the
+  number of active columns.
+  """
+  ndim = 2
+
+  def __init__(self, data, indices, indptr, shape):
+    self.data = np.asarray(data)
+    self.indices = np.asarray(indices, dtype=np.int64)
+    self.indptr = np.asarray(indptr, dtype=np.int64)
+    self.shape = tuple(int(n) for n in shape)
+    self._columns = None
+    assert(self.indptr.shape == (self.shape[0] + 1,))
+    assert(self.data.shape == self.indices.shape == (self.indptr[-1],))
+
+  @classmethod
+  def from_dense(cls, X):
+    """Build a CSRMatrix from the nonzero entries of a 2-D array.
+
+    Parameters
+    ----------
+    X : np.array
+      Dense matrix.
+
+    Returns
+    -------
+    CSRMatrix
+    """
+    X = np.asarray(X)
+    assert(X.ndim == 2)
+    rows, columns = np.nonzero(X)
+    indptr = np.zeros(shape=X.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=X.shape[0]), out=indptr[1:])
+    return cls(X[rows, columns], columns, indptr, X.shape)
+
+  @property
+  def dtype(self):
+    return self.data.dtype
+
+  @property
+  def nnz(self):
+    """Number of stored values."""
+    return self.data.shape[0]
+
+  def __len__(self):
+    return self.shape[0]
+
+  def astype(self, dtype, copy=True):
+    """Return the matrix with values cast to dtype.
+
+    Parameters
+    ----------
+    dtype : np.dtype
+      Data type of the values.
+    copy : bool
+      Always copy the values (defaults to True); otherwise self is returned
+      when it already has dtype.
+
+    Returns
+    -------
+    CSRMatrix
+    """
+    if not copy and self.data.dtype == dtype:
+      return self
+    return CSRMatrix(
+      self.data.astype(dtype), self.indices, self.indptr, self.shape)
+
+  def toarray(self):
+    """Return the matrix as a dense array."""
+    X = np.zeros(shape=self.shape, dtype=self.dtype)
+    X[self.rows(), self.indices] = self.data
+    return X
+
+  def __getitem__(self, rows):
+    """Select rows with a slice of step 1 (a view) or an index array."""
+    if isinstance(rows, slice) and rows.step in (None, 1):
+      start, stop, _ = rows.indices(self.shape[0])
+      stop = max(start, stop)
+      a, b = self.indptr[start], self.indptr[stop]
+      return CSRMatrix(
+        self.data[a:b], self.indices[a:b],
+        self.indptr[start:stop + 1] - a, (stop - start, self.shape[1]))
+    return self.take(np.arange(self.shape[0])[rows])
+
+  def take(self, rows):
+    """Gather rows into a new matrix.
+
+    Parameters
+    ----------
+    rows : np.array
+      Row indices, in the order of the result.
+
+    Returns
+    -------
+    CSRMatrix
+    """
+    rows = np.asarray(rows)
+    starts = self.indptr[rows]
+    lengths = self.indptr[rows + 1] - starts
+    indptr = np.zeros(shape=rows.shape[0] + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    positions = np.repeat(starts - indptr[:-1], lengths)
+    positions += np.arange(indptr[-1])
+    return CSRMatrix(
+      self.data[positions], self.indices[positions], indptr,
+      (rows.shape[0], self.shape[1]))
+
+  def rows(self):
+    """Row of every stored value."""
+    return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+  def active_columns(self):
+    """Return the active columns and where each stored value's column is.
+
+    Returns
+    -------
+    (np.array, np.array)
+      Sorted distinct columns holding stored values, and for every stored
+      value the index of its column in that array.
+
+    Notes:
+    ------
+    The result is cached on the matrix, since a Dense layer needs it in every
+    backward pass over the batch.
+    """
+    if self._columns is None:
+      self._columns = np.unique(self.indices, return_inverse=True)
+    return self._columns
+
+  def dot(self, dense, out=None):
+    """Sparse times dense product.
+
+    Parameters
+    ----------
+    dense : np.array
+      Matrix with shape (columns, k).
+    out : np.array
+      Optional (rows, k) array to write the product into.
+
+    Returns
+    -------
+    np.array
+      self @ dense.
+    """
+    return sparse_linear(self, dense.T, out=out)
+
+def take_columns(a, columns):
+  """Gather the given last-axis columns of a into a new array."""
+  return np.take(a, columns, axis=-1)
+
+def put_columns(a, columns, values):
+  """Write values into the given last-axis columns of a, in place.
+
+  Parameters
+  ----------
+  a : np.array
+    Destination array.
+  columns : np.array
+    Column indices along the last axis.
+  values : np.array or scalar
+    Array shaped like take_columns(a, columns), or a scalar.
+
+  Notes:
+  ------
+  Assigns row by row, which is faster than assigning through a[...,
+  columns] or np.put on flat positions for wide arrays and allocates no
+  index arrays.
+  """
+  values = np.broadcast_to(values, a.shape[:-1] + (len(columns),))
+  for index in np.ndindex(a.shape[:-1]):
+    a[index][columns] = values[index]
+
+def sparse_linear(x, weight, out=None):
+  """Compute x @ weight.T for sparse x, as in the forward pass of Dense.
+
+  Parameters
+  ----------
+  x : CSRMatrix
+    Input batch with shape (batch, in_dim).
+  weight : np.array
+    Weight with shape (out_dim, in_dim).
+  out : np.array
+    Optional (batch, out_dim) array to write the product into.
+
+  Returns
+  -------
+  np.array
+    The product.
+
+  Notes:
+  ------
+  Output j of row i is the sum of data[k] * weight[j, indices[k]] over the
+  stored values k of row i. One output at a time, the weights of the stored
+  values are gathered from a contiguous weight row, scaled and summed per
+  row with np.bincount, so the scratch memory is O(nnz) and the time
+  follows nnz * out_dim.
+  """
+  if out is None:
+    out = np.empty(
+      shape=(x.shape[0], weight.shape[0]),
+      dtype=np.result_type(x.dtype, weight))
+  rows = x.rows()
+  gathered = np.empty(shape=x.nnz, dtype=np.result_type(x.dtype, weight))
+  for j in range(weight.shape[0]):
+    np.take(weight[j], x.indices, out=gathered)
+    gathered *= x.data
+    out[:, j] = np.bincount(rows, weights=gathered, minlength=x.shape[0])
+  return out
+
+def sparse_weight_grad(x, grad, param, accumulate=False):
+  """Write the weight gradient of a Dense layer with sparse input.
+
+  Parameters
+  ----------
+  x : CSRMatrix
+    Input batch of the layer.
+  grad : np.array
+    Gradient w.r.t. the layer output, with shape (batch, out_dim).
+  param : Parameter
+    Weight parameter with shape (out_dim, in_dim).
+  accumulate : bool
+    Add to the gradient instead of overwriting it (defaults to False).
+
+  Notes:
+  ------
+  Computes grad.T @ x / batch as a scatter-add over the stored values:
+  column c of output j receives the sum of grad[row(k), j] * data[k] over
+  the values k in column c, added up with np.bincount one output at a
+  time and written straight into that row of param.grad. The scratch
+  memory is O(nnz) and the time follows nnz * out_dim. Only the columns of
+  param.grad that are active in x, plus the columns left by the previous
+  step, are written; the latter are zeroed first. The columns that may be
+  nonzero are recorded in param.touched (None when every column may be).
+  """
+  columns, inverse = x.active_columns()
+  if not accumulate:
+    if param.touched is None:
+      param.grad.fill(0)
+    else:
+      put_columns(param.grad, param.touched, 0)
+  grad_t = np.ascontiguousarray(grad.T)
+  rows = x.rows()
+  gathered = np.empty(shape=x.nnz, dtype=np.result_type(x.dtype, grad))
+  for j in range(grad.shape[1]):
+    np.take(grad_t[j], rows, out=gathered)
+    gathered *= x.data
+    dW = np.bincount(
+      inverse, weights=gathered, minlength=columns.shape[0]) / x.shape[0]
+    if accumulate:
+      param.grad[j][columns] += dW
+    else:
+      param.grad[j][columns] = dW
+  if accumulate:
+    columns = None if param.touched is None \
+      else np.union1d(param.touched, columns)
+  param.touched = columns
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
 from .dataset import Dataset
+from .loader import DataLoader
+from .memmap import MemmapDataset
 
 __all__ = [
-  "Dataset"
+  "Dataset", "DataLoader", "MemmapDataset"
 ]
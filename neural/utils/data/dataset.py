@@ -2,35 +2,100 @@
 
 import numpy as np
 
+from ...sparse import CSRMatrix
+
 class Dataset:
   """Dataset iterator.
 
   Parameters
   ----------
-  X : np.array
-    Input data points. Should have shape (dataset size, features).
+  X : np.array or CSRMatrix
+    Input data points. Should have shape (dataset size, features). Sparse
+    inputs are batched as CSRMatrix without densifying.
   y : np.array
-    Output one-hot labels. Should have shape (dataset size, classes).
+    Output labels, either one-hot with shape (dataset size, classes) or
+    integer class indices with shape (dataset size,). In-memory class indices
+    are stored as int32.
   batch : int
     Number samples used in one forward and backward pass (defaults to 32).
+  rng : np.random.Generator
+    Random number generator for shuffling (defaults to a new unseeded one).
+    Give every dataset its own stream, e.g. from Sequential.spawn_rng.
   """
-  def __init__(self, X, y, batch=32):
+  def __init__(self, X, y, batch=32, rng=None):
+    if isinstance(y, np.ndarray) and not isinstance(y, np.memmap) \
+        and y.ndim == 1:
+      y = y.astype(np.int32, copy=False)
     self.X = X
     self.y = y
     self.batch = batch
     self.size = X.shape[0] // batch
+    self.rng = np.random.default_rng() if rng is None else rng
 
-  def __iter__(self):
-    self.idx = 0
-    self.indices = np.random.permutation(
+  def chunks(self, size=None):
+    """Iterate over the dataset in order, as contiguous slices.
+
+    Parameters
+    ----------
+    size : int
+      Number of data points per chunk (defaults to the whole dataset).
+
+    Returns
+    -------
+    generator
+      Yields (X, y) slices covering every data point exactly once.
+    """
+    n = self.X.shape[0]
+    size = n if size is None else size
+    assert(size > 0)
+    for start in range(0, n, size):
+      yield (self.X[start:start + size], self.y[start:start + size])
+
+  def gather(self, indices, out=None):
+    """Copy the data points at indices into a batch.
+
+    Parameters
+    ----------
+    indices : np.array
+      Indices of the data points in the batch.
+    out : (np.array, np.array)
+      Optional arrays to write the inputs and labels into. Sparse inputs
+      are always gathered into a new CSRMatrix.
+
+    Returns
+    -------
+    (np.array, np.array)
+      Inputs and labels of the batch.
+    """
+    X, y = (None, None) if out is None else out
+    if isinstance(self.X, CSRMatrix):
+      X = self.X.take(indices)
+    else:
+      X = np.take(self.X, indices, axis=0, out=X)
+    return (X, np.take(self.y, indices, axis=0, out=y))
+
+  def shuffle(self):
+    """Draw a random assignment of data points to batches.
+
+    Returns
+    -------
+    np.array
+      Indices of the data points in each batch. Should have shape
+      (size, batch).
+    """
+    return self.rng.permutation(
       self.X.shape[0]
     )[:self.size * self.batch].reshape(self.size, self.batch)
+
+  def __iter__(self):
+    self.idx = 0
+    self.indices = self.shuffle()
     return self
   
   def __next__(self):
     if self.idx < self.size:
       batch = self.indices[self.idx]
       self.idx += 1
-      return (self.X[batch], self.y[batch])
+      return self.gather(batch)
     else:
       raise StopIteration()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from ...sparse import CSRMatrix
+
+class DataLoader:
+  """Batch iterator that gathers upcoming batches on a background thread.
+
+  Parameters
+  ----------
+  dataset : Dataset
+    Dataset to draw batches from.
+  prefetch : int
+    Number of batches gathered ahead of the consumer (defaults to 2).
+  block_shuffle : bool
+    Shuffle the order of contiguous batch-sized blocks instead of individual
+    data points (defaults to False). Every batch is then a slice of the
+    dataset arrays, returned without copying; the data should be shuffled
+    once up front so that the blocks are representative.
+
+  Attributes
+  ----------
+  wait_time : float
+    Seconds the consumer spent blocked on the next batch during the current
+    or last epoch.
+
+  Notes:
+  ------
+  Gathered batches live in a ring of prefetch + 1 preallocated buffers. A
+  batch stays valid until the next one is requested, after which its buffer
+  is refilled. Sparse inputs are never densified: the ring then only holds
+  labels, and every batch of inputs is a new CSRMatrix taken from the
+  dataset.
+  """
+  def __init__(self, dataset, prefetch=2, block_shuffle=False):
+    assert(prefetch > 0)
+    self.dataset = dataset
+    self.prefetch = prefetch
+    self.block_shuffle = block_shuffle
+    self.wait_time = 0.0
+    self.ring = None
+    self.batches = None
+    self.worker = None
+
+  @property
+  def X(self):
+    """Input data points of the underlying dataset."""
+    return self.dataset.X
+
+  @property
+  def y(self):
+    """Output labels of the underlying dataset."""
+    return self.dataset.y
+
+  @property
+  def batch(self):
+    """Number of samples per batch."""
+    return self.dataset.batch
+
+  @property
+  def size(self):
+    """Number of batches per epoch."""
+    return self.dataset.size
+
+  def chunks(self, size=None):
+    """Iterate over the dataset in order, as contiguous slices.
+
+    Parameters
+    ----------
+    size : int
+      Number of data points per chunk (defaults to the whole dataset).
+
+    Returns
+    -------
+    generator
+      Yields (X, y) slices covering every data point exactly once.
+    """
+    return self.dataset.chunks(size)
+
+  def __iter__(self):
+    self.close()
+    self.wait_time = 0.0
+    if self.block_shuffle:
+      return self.iterate_blocks()
+    return self.iterate_gathered()
+
+  def iterate_blocks(self):
+    """Yield contiguous batches in a random block order."""
+    X, y, batch = self.dataset.X, self.dataset.y, self.dataset.batch
+    for block in self.dataset.rng.permutation(self.size):
+      start = block * batch
+      yield (X[start:start + batch], y[start:start + batch])
+
+  def iterate_gathered(self):
+    """Yield batches gathered by the background thread."""
+    if self.ring is None:
+      sparse = isinstance(self.X, CSRMatrix)
+      self.ring = [
+        (None if sparse else
+           np.empty((self.batch,) + self.X.shape[1:], dtype=self.X.dtype),
+         np.empty((self.batch,) + self.y.shape[1:], dtype=self.y.dtype))
+        for _ in range(self.prefetch + 1)
+      ]
+      self.batches = list(self.ring)
+    self.free = queue.Queue()
+    self.ready = queue.Queue()
+    for slot in range(len(self.ring)):
+      self.free.put(slot)
+    self.stopped = threading.Event()
+    self.worker = threading.Thread(
+      target=self.gather, args=(self.dataset.shuffle(),), daemon=True)
+    self.worker.start()
+
+    held = None
+    for _ in range(self.size):
+      if held is not None:
+        self.free.put(held)
+      start = time.perf_counter()
+      held = self.ready.get()
+      self.wait_time += time.perf_counter() - start
+      if isinstance(held, BaseException):
+        raise held
+      yield self.batches[held]
+    self.free.put(held)
+
+  def gather(self, indices):
+    """Fill ring buffers with the batches listed in indices.
+
+    Parameters
+    ----------
+    indices : np.array
+      Indices of the data points in each batch. Should have shape
+      (size, batch).
+    """
+    try:
+      for batch in indices:
+        slot = self.free.get()
+        if self.stopped.is_set():
+          return
+        self.batches[slot] = self.dataset.gather(
+          batch, out=self.ring[slot])
+        self.ready.put(slot)
+    except BaseException as e:
+      self.ready.put(e)
+
+  def close(self):
+    """Stop the background thread of an unfinished epoch."""
+    if self.worker is None:
+      return
+    self.stopped.set()
+    self.free.put(None)
+    self.worker.join()
+    self.worker = None
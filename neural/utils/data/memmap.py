@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+
+from .dataset import Dataset
+
+def open_npy(source):
+  """Memory-map a .npy file, or a sorted directory or list of .npy shards.
+
+  Parameters
+  ----------
+  source : str or str[] or np.array
+    Path to a .npy file, path to a directory of .npy shards, list of shard
+    paths, or an array that is returned unchanged.
+
+  Returns
+  -------
+  np.memmap or ShardedArray
+    Read-only view of the data on disk.
+  """
+  if isinstance(source, np.ndarray):
+    return source
+  if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+    source = sorted(
+      os.path.join(source, name)
+        for name in os.listdir(source) if name.endswith(".npy"))
+  if isinstance(source, (str, os.PathLike)):
+    return np.load(source, mmap_mode="r")
+  shards = [np.load(path, mmap_mode="r") for path in source]
+  return shards[0] if len(shards) == 1 else ShardedArray(shards)
+
+class ShardedArray:
+  """Read-only concatenation of arrays along the first axis.
+
+  Parameters
+  ----------
+  shards : np.array[]
+    Arrays with matching trailing shapes and dtypes, typically memory-mapped
+    .npy files.
+  """
+  def __init__(self, shards):
+    for shard in shards:
+      assert(shard.shape[1:] == shards[0].shape[1:])
+      assert(shard.dtype == shards[0].dtype)
+    self.shards = shards
+    self.offsets = np.cumsum([0] + [shard.shape[0] for shard in shards])
+    self.shape = (int(self.offsets[-1]),) + shards[0].shape[1:]
+    self.dtype = shards[0].dtype
+    self.ndim = len(self.shape)
+
+  def __len__(self):
+    return self.shape[0]
+
+  def __getitem__(self, key):
+    """Read a contiguous slice or an array of row indices into memory."""
+    if isinstance(key, slice):
+      start, stop, step = key.indices(self.shape[0])
+      assert(step == 1)
+      return self.take(np.arange(start, stop))
+    return self.take(np.asarray(key))
+
+  def take(self, indices, out=None):
+    """Gather rows, reading each shard once.
+
+    Parameters
+    ----------
+    indices : np.array
+      Row indices. Sorted indices give sequential reads within each shard.
+    out : np.array
+      Optional array to write the rows into.
+
+    Returns
+    -------
+    np.array
+      The gathered rows.
+    """
+    if out is None:
+      out = np.empty((len(indices),) + self.shape[1:], dtype=self.dtype)
+    shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+    for shard_id in np.unique(shard_ids):
+      rows = shard_ids == shard_id
+      local = indices[rows] - self.offsets[shard_id]
+      if local.size == local[-1] - local[0] + 1 and \
+          np.all(local[1:] > local[:-1]):
+        out[rows] = self.shards[shard_id][local[0]:local[-1] + 1]
+      else:
+        out[rows] = np.take(self.shards[shard_id], local, axis=0)
+    return out
+
+def take(array, indices, out=None):
+  """Gather rows of a memory-mapped or sharded array.
+
+  Parameters
+  ----------
+  array : np.array or ShardedArray
+    Source rows.
+  indices : np.array
+    Row indices.
+  out : np.array
+    Optional array to write the rows into.
+
+  Returns
+  -------
+  np.array
+    The gathered rows.
+  """
+  if isinstance(array, ShardedArray):
+    return array.take(indices, out=out)
+  return np.take(array, indices, axis=0, out=out)
+
+class MemmapDataset(Dataset):
+  """Out-of-core dataset iterator backed by memory-mapped .npy files.
+
+  Parameters
+  ----------
+  X : str or str[]
+    Input data points: a .npy file, a directory of .npy shards or a list of
+    shard paths. Should have shape (dataset size, features).
+  y : str or str[]
+    Output labels, in the same form as X. Either one-hot with shape
+    (dataset size, classes) or integer class indices with shape
+    (dataset size,), ideally stored as int32.
+  batch : int
+    Number samples used in one forward and backward pass (defaults to 32).
+  window : int
+    Number of batches drawn from each contiguous window of data points
+    (defaults to 64).
+  rng : np.random.Generator
+    Random number generator for shuffling (defaults to a new unseeded one).
+
+  Notes:
+  ------
+  An epoch visits the windows in random order and shuffles data points only
+  within a window, so the pages being read stay within window * batch rows
+  of each other. Indices within a batch are sorted so every gather reads
+  forward through the file. The windows start at a random offset each
+  epoch, so the data points left over after the last full batch differ
+  from epoch to epoch. Sequential.test reads one window at a time unless
+  given an explicit chunk_size.
+  """
+  def __init__(self, X, y, batch=32, window=64, rng=None):
+    super().__init__(open_npy(X), open_npy(y), batch=batch, rng=rng)
+    assert(self.X.shape[0] == self.y.shape[0])
+    self.window = window
+
+  def gather(self, indices, out=None):
+    """Read the data points at indices into a batch.
+
+    Parameters
+    ----------
+    indices : np.array
+      Indices of the data points in the batch.
+    out : (np.array, np.array)
+      Optional arrays to write the inputs and labels into.
+
+    Returns
+    -------
+    (np.array, np.array)
+      Inputs and labels of the batch.
+    """
+    X, y = (None, None) if out is None else out
+    return (take(self.X, indices, out=X), take(self.y, indices, out=y))
+
+  def shuffle(self):
+    """Draw a locality-aware assignment of data points to batches.
+
+    Returns
+    -------
+    np.array
+      Indices of the data points in each batch. Should have shape
+      (size, batch).
+    """
+    used = self.size * self.batch
+    span = self.window * self.batch
+    offset = self.rng.integers(self.X.shape[0] - used + 1)
+    windows = self.rng.permutation(np.arange(0, used, span))
+    indices = np.concatenate([
+      offset + start + self.rng.permutation(min(span, used - start))
+        for start in windows
+    ]).reshape(self.size, self.batch)
+    indices.sort(axis=1)
+    return indices
+
+  def chunks(self, size=None):
+    """Iterate over the dataset in order, as contiguous slices.
+
+    Parameters
+    ----------
+    size : int
+      Number of data points per chunk (defaults to window * batch).
+
+    Returns
+    -------
+    generator
+      Yields (X, y) slices covering every data point exactly once.
+    """
+    return super().chunks(self.window * self.batch if size is None else size)
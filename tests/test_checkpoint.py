@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.checkpoint import save_checkpoint, load_checkpoint
+
+def make(seed):
+  return Sequential(
+    [Dense(4, 6), ReLU(), Dense(6, 3)], loss=SoftmaxCrossEntropy,
+    optimizer=Adam, lr_scheduler=ConstantLR, seed=seed)
+
+def test_save_replaces_the_previous_checkpoint(tmp_path):
+  path = str(tmp_path / "ckpt")
+  save_checkpoint(make(0), path)
+  saved = make(1)
+  save_checkpoint(saved, path)
+  assert sorted(os.listdir(tmp_path)) == ["ckpt"]
+
+  model = make(2)
+  load_checkpoint(model, path)
+  for p, q in zip(model.params, saved.params):
+    np.testing.assert_array_equal(p.value, q.value)
+
+def test_load_falls_back_to_an_interrupted_save(tmp_path):
+  path = str(tmp_path / "ckpt")
+  saved = make(0)
+  save_checkpoint(saved, path)
+  os.rename(path, path + ".old")
+
+  model = make(1)
+  load_checkpoint(model, path)
+  for p, q in zip(model.params, saved.params):
+    np.testing.assert_array_equal(p.value, q.value)
+  save_checkpoint(model, path)
+  assert sorted(os.listdir(tmp_path)) == ["ckpt"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+import math
+
+import numpy as np
+import pytest
+
+from neural.nn.functional import sigmoid, tanh, relu, log_softmax
+from neural.model import categorical_cross_entropy_from_logits
+
+DTYPES = [np.float32, np.float64]
+
+def extremes(dtype):
+  """Inputs at +-1e3 and at the float32 limits, plus a few ordinary ones."""
+  limit = float(np.finfo(np.float32).max)
+  tiny = float(np.finfo(np.float32).tiny)
+  return np.array(
+    [0.0, tiny, -tiny, 1.0, -1.0, 710.0, -710.0, 1e3, -1e3, limit, -limit],
+    dtype=dtype)
+
+def assert_matches(result, expected, dtype):
+  """Check result against a long double reference to a few ulps of dtype."""
+  assert(result.dtype == dtype)
+  assert not np.any(np.isnan(result))
+  expected = np.asarray(expected, dtype=np.longdouble)
+  error = np.abs(result.astype(np.longdouble) - expected)
+  finfo = np.finfo(dtype)
+  tolerance = 4 * float(finfo.eps) * np.abs(expected) \
+    + float(finfo.smallest_subnormal)
+  assert np.all(error <= tolerance), (result, expected.astype(dtype))
+
+@pytest.fixture(autouse=True)
+def raise_on_floating_point_errors():
+  """Turn overflow, invalid and divide-by-zero warnings into errors."""
+  with np.errstate(over="raise", invalid="raise", divide="raise"):
+    yield
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_sigmoid_extremes(dtype):
+  x = extremes(dtype)
+  exact = x.astype(np.longdouble)
+  with np.errstate(over="ignore"):
+    expected = 1 / (1 + np.exp(-exact))
+  assert_matches(sigmoid(x), expected, dtype)
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_sigmoid_in_place(dtype):
+  x = extremes(dtype)
+  expected = sigmoid(x)
+  workspace = np.empty_like(x)
+  out = sigmoid(x, out=x, workspace=workspace)
+  assert out is x
+  np.testing.assert_array_equal(out, expected)
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_tanh_extremes(dtype):
+  x = extremes(dtype)
+  assert_matches(tanh(x), [math.tanh(v) for v in x.tolist()], dtype)
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_relu_extremes(dtype):
+  x = extremes(dtype)
+  assert_matches(relu(x), [max(v, 0.0) for v in x.tolist()], dtype)
+
+def logits(dtype):
+  """Rows of extreme logits whose pairwise differences stay finite."""
+  limit = float(np.finfo(np.float32).max)
+  return np.array([
+    [0.0, 0.0, 0.0],
+    [1e3, -1e3, 0.0],
+    [-1e3, 1e3, 1e3],
+    [limit, 0.0, -1e3],
+    [-limit, 0.0, 1e3],
+    [limit, limit, limit],
+    [-limit, -limit, 0.0]], dtype=dtype)
+
+def reference_log_softmax(x):
+  exact = x.astype(np.longdouble)
+  shifted = exact - np.max(exact, axis=1, keepdims=True)
+  return shifted - np.log(np.sum(np.exp(shifted), axis=1, keepdims=True))
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_log_softmax_extremes(dtype):
+  x = logits(dtype)
+  assert_matches(log_softmax(x), reference_log_softmax(x), dtype)
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_cross_entropy_from_logits_extremes(dtype):
+  x = logits(dtype)
+  labels = np.array([0, 1, 0, 2, 0, 1, 0])
+  expected = -reference_log_softmax(x)[np.arange(x.shape[0]), labels]
+  losses = categorical_cross_entropy_from_logits(x, labels, reduce=False)
+  assert_matches(losses, expected, dtype)
+  assert np.all(np.isfinite(losses))
+
+  one_hot = np.eye(3, dtype=dtype)[labels]
+  losses = categorical_cross_entropy_from_logits(x, one_hot, reduce=False)
+  assert_matches(losses, expected, dtype)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pytest
+
+from neural.nn import SoftmaxCrossEntropy
+from neural.metrics import Loss
+
+@pytest.mark.parametrize("one_hot", [False, True])
+def test_loss_from_loss_module_matches_log_softmax(one_hot):
+  rng = np.random.default_rng(0)
+  logits = rng.standard_normal((16, 5)) * 30
+  labels = rng.integers(0, 5, 16)
+  if one_hot:
+    labels = np.eye(5)[labels]
+  loss = SoftmaxCrossEntropy()
+  loss.forward(logits.copy())
+
+  expected, result = Loss(), Loss()
+  expected.update(logits, labels)
+  result.update_from_loss(loss, labels)
+  np.testing.assert_allclose(result.result(), expected.result(), rtol=1e-12)
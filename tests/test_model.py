@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+
+def test_modules_may_be_a_tuple():
+  modules = (Dense(4, 3), ReLU(), Dense(3, 2))
+  model = Sequential(
+    modules, loss=SoftmaxCrossEntropy, optimizer=Adam,
+    lr_scheduler=ConstantLR, seed=0)
+  assert model.modules == list(modules)
+  X = np.random.default_rng(0).standard_normal((5, 4))
+  assert model.predict(X).shape == (5, 2)
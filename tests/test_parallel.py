@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from neural import Sequential, DataParallel
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import MemmapDataset
+
+def test_data_parallel_trains_on_sharded_memmap(tmp_path):
+  rng = np.random.default_rng(1)
+  for name in ("X", "y"):
+    (tmp_path / name).mkdir()
+  for k in range(3):
+    np.save(tmp_path / "X" / ("%d.npy" % k), rng.standard_normal((70, 6)))
+    np.save(
+      tmp_path / "y" / ("%d.npy" % k), rng.integers(0, 3, 70).astype(np.int32))
+  model = Sequential(
+    [Dense(6, 8), ReLU(), Dense(8, 3)], loss=SoftmaxCrossEntropy,
+    optimizer=Adam, lr_scheduler=ConstantLR, seed=0)
+  dataset = MemmapDataset(
+    str(tmp_path / "X"), str(tmp_path / "y"), batch=20,
+    rng=np.random.default_rng(0))
+  loss, accuracy = DataParallel(model, workers=2).train(dataset, callbacks=[])
+  assert np.isfinite(loss) and 0 <= accuracy <= 1
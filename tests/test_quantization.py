@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, BatchNorm1d, ReLU, Dropout, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.quantization import QuantizedDense, quantize
+
+def test_quantize_does_not_share_modules_with_the_float_model():
+  model = Sequential(
+    [Dense(6, 8), BatchNorm1d(8), ReLU(), Dropout(0.5), Dense(8, 3)],
+    loss=SoftmaxCrossEntropy, optimizer=Adam, lr_scheduler=ConstantLR,
+    seed=0)
+  quantized = quantize(model)
+  assert isinstance(quantized.modules[0], QuantizedDense)
+  for module, q in zip(model.modules, quantized.modules):
+    assert q is not module
+  assert quantized.loss is not model.loss
+
+  X = np.random.default_rng(0).standard_normal((5, 6))
+  expected = quantized.predict(X, logits=True)
+  model.set_training(False)
+  for a in model.modules[1].statistics:
+    a += 1.0
+  np.testing.assert_array_equal(quantized.predict(X, logits=True), expected)
+  assert quantized.modules[3].training
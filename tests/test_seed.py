@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from neural import Sequential
+from neural.nn import Dense, ReLU, SoftmaxCrossEntropy
+from neural.nn.lazy import LazyDense
+from neural.nn.images import Conv2D, Flatten
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.utils.data import Dataset
+
+def make(modules, **kwargs):
+  return Sequential(
+    modules, loss=SoftmaxCrossEntropy, optimizer=Adam,
+    lr_scheduler=ConstantLR, **kwargs)
+
+def values(model):
+  return [p.value.copy() for p in model.params]
+
+def assert_same(a, b):
+  assert len(a) == len(b)
+  for x, y in zip(a, b):
+    np.testing.assert_array_equal(x, y)
+
+def test_seed_makes_initialization_reproducible():
+  a = make([Dense(8, 16), ReLU(), Dense(16, 3)], seed=0)
+  b = make([Dense(8, 16), ReLU(), Dense(16, 3)], seed=0)
+  c = make([Dense(8, 16), ReLU(), Dense(16, 3)], seed=1)
+  assert_same(values(a), values(b))
+  assert not np.array_equal(a.params[0].value, c.params[0].value)
+
+def test_seed_covers_lazy_and_conv_modules():
+  def build():
+    model = make([Conv2D(1, 2, 3), Flatten(), LazyDense(3)], seed=4)
+    model.build((1, 6, 6))
+    return model
+  assert_same(values(build()), values(build()))
+
+def test_seeded_training_is_reproducible():
+  rng = np.random.default_rng(0)
+  X, y = rng.standard_normal((96, 8)), rng.integers(0, 3, 96)
+  def train():
+    model = make([Dense(8, 16), ReLU(), Dense(16, 3)], seed=2)
+    model.train(
+      Dataset(X, y, batch=32, rng=model.spawn_rng()), callbacks=[])
+    return values(model)
+  assert_same(train(), train())
+
+def test_seed_keeps_hand_set_parameters():
+  dense = Dense(4, 3)
+  dense.trainable_parameters[0].value[...] = 7.0
+  model = make([dense, ReLU(), Dense(3, 2)], seed=0)
+  assert np.all(model.params[0].value == 7.0)
+
+def test_seed_keeps_parameters_from_an_explicit_rng():
+  dense = Dense(4, 3, rng=np.random.default_rng(9))
+  expected = dense.trainable_parameters[0].value.copy()
+  make([dense], seed=0)
+  np.testing.assert_array_equal(dense.trainable_parameters[0].value, expected)
+
+def test_reinitialize_overrides_the_default():
+  dense = Dense(4, 3)
+  dense.trainable_parameters[0].value[...] = 7.0
+  model = make([dense], seed=0, reinitialize=True)
+  assert not np.all(model.params[0].value == 7.0)
+
+  a = make([Dense(4, 3)], seed=0, reinitialize=False)
+  b = make([Dense(4, 3)], seed=0, reinitialize=False)
+  assert not np.array_equal(a.params[0].value, b.params[0].value)
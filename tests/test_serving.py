@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pytest
+
+from neural import Sequential
+from neural.nn import Dense, SoftmaxCrossEntropy
+from neural.optim import Adam
+from neural.optim.lr_scheduler import ConstantLR
+from neural.serving import InferenceEngine
+
+def test_close_finishes_queued_requests_and_rejects_new_ones():
+  model = Sequential(
+    [Dense(4, 3)], loss=SoftmaxCrossEntropy, optimizer=Adam,
+    lr_scheduler=ConstantLR, seed=0)
+  X = np.random.default_rng(0).standard_normal((8, 4))
+  engine = InferenceEngine(model, max_latency=0.01)
+  futures = [engine.submit(x) for x in X]
+  engine.close()
+  np.testing.assert_allclose(
+    np.stack([f.result(timeout=5) for f in futures]), model.predict(X))
+
+  with pytest.raises(RuntimeError):
+    engine.submit(X[0])
+  engine.close()